@@ -1,44 +1,106 @@
 # agent.py
 import asyncio
+import logging
 
 from dotenv import load_dotenv
 from livekit import agents
-from livekit.agents import AgentSession, ChatContext
+from livekit.agents import AgentSession
 from livekit.plugins import openai, deepgram, silero
 import os
 from assistant import Assistant
+from availability import availability
+from booking_writer import booking_writer
+import dates
+from city_index import city_index
+from context_window import reset_flow
+from instructions import GREETING
+from logs import setup_logging
+from loop_watchdog import LOOP_WATCHDOG, loop_watchdog
+from menu_cache import menu_cache
+from publisher import ClientReadiness, StatePublisher
+from repository import get_repository
+from telemetry import current_session, telemetry
 
 load_dotenv(".env")
 
+logger = logging.getLogger("agent")
+
+
+def prewarm(proc: agents.JobProcess):
+    """
+    Runs once per worker process before it takes jobs: load the VAD model,
+    build the plugin clients, warm dateparser and open the Supabase
+    connection pool, so a new job only has to connect to the room.
+    """
+    # Logging goes through a queue thread from here on, not the event loop
+    setup_logging()
+    proc.userdata["vad"] = silero.VAD.load()
+    proc.userdata["stt"] = deepgram.STT(model="nova-3")
+    proc.userdata["llm"] = openai.LLM(model=os.getenv("LLM_CHOICE", "gpt-4.1-mini"))
+    proc.userdata["tts"] = deepgram.TTS(model="aura-2-odysseus-en")
+    proc.userdata["repository"] = get_repository()
+    dates.warm()
+    # First query also opens the pooled HTTP connection. Each cache warms on its
+    # own, so one failing doesn't leave the others cold
+    for name, warm in (("city index", city_index.load), ("menu cache", menu_cache.warm),
+                       ("availability", availability.load)):
+        try:
+            warm()
+        except Exception:
+            # Jobs still work: this cache loads on first use instead
+            logger.exception("%s prewarm failed", name)
+
 
 async def entrypoint(ctx: agents.JobContext):
+    if LOOP_WATCHDOG:
+        # Before the session is set, so its heartbeat isn't tagged with this room
+        loop_watchdog.start()
     # llm = openai.LLM.with_ollama(
     #     model=os.getenv("OLLAMA_MODEL", "llama3.2"),
     #     base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/v1"),
     # )
+    # Listen before connecting so an early client_ready isn't missed
+    readiness = ClientReadiness()
+    readiness.attach(ctx.room)
     await ctx.connect()
+    publisher = StatePublisher(ctx.room.local_participant, readiness)
+    publisher.attach(ctx.room)
     # llm = llm,
     # tts = deepgram.TTS(),
+    proc = ctx.proc.userdata
     session = AgentSession(
-        stt=deepgram.STT(model="nova-3"),
-        llm=openai.LLM(model=os.getenv("LLM_CHOICE", "gpt-4.1-mini")),
-        tts=deepgram.TTS(model="aura-2-odysseus-en"),
-        vad=silero.VAD.load(),
+        stt=proc["stt"],
+        llm=proc["llm"],
+        tts=proc["tts"],
+        vad=proc["vad"],
     )
 
     session.userdata = {}
+    # Tool, DB and publish spans pick the session up from this context
+    current_session.set(ctx.room.name)
+    session.on("metrics_collected", lambda ev: telemetry.on_metrics(ev.metrics))
+    telemetry.start()
 
-    assistant = Assistant(participant=ctx.room.local_participant)
+    async def flush_telemetry():
+        await telemetry.close_session(ctx.room.name)
+    ctx.add_shutdown_callback(flush_telemetry)
+
+    async def drain_bookings():
+        # Whatever doesn't make it stays in the WAL for the next worker
+        await booking_writer.drain()
+    ctx.add_shutdown_callback(drain_bookings)
+
+    assistant = Assistant(participant=ctx.room.local_participant, repository=proc["repository"],
+                          publisher=publisher)
     await session.start(room=ctx.room, agent=assistant)
     await asyncio.sleep(0.2)
-    await assistant.update_chat_ctx(ChatContext())
-    await session.generate_reply(
-        instructions="Greet the user warmly and tell them you can help book flights, order a food, book hotel, or book a rides."
-    )
+    await assistant.update_chat_ctx(reset_flow(assistant.chat_ctx))
+    await session.generate_reply(instructions=GREETING)
 
 
 if __name__ == "__main__":
     agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint,
+                                            prewarm_fnc=prewarm,
                                             ws_url=os.getenv("LIVEKIT_URL"),
                                             api_key=os.getenv("LIVEKIT_API_KEY"),
                                             api_secret=os.getenv("LIVEKIT_API_SECRET")))
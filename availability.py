@@ -0,0 +1,174 @@
+# availability.py
+# Process-wide ride and hotel indexes, shared by every session on a worker.
+#
+# Both tables are small and change rarely, so they are loaded whole (prewarm,
+# then refreshed in the background after AVAILABILITY_TTL) and grouped per
+# city / country into numpy columns. A fare quote or hotel shortlist is then
+# one vectorized pass over that group, with no query per utterance.
+import asyncio
+import hashlib
+import os
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from matching import FuzzyIndex
+from refreshing import RefreshingIndex
+from repository import DataBackend
+
+AVAILABILITY_TTL = float(os.getenv("AVAILABILITY_TTL", "900"))
+
+# Known cities (spelled as shown to the user) and their country, for country-wide ride rows
+CITY_COUNTRIES = {
+    "Dubai": "UAE", "Abu Dhabi": "UAE", "Sharjah": "UAE",
+    "Riyadh": "Saudi Arabia", "Jeddah": "Saudi Arabia", "Dammam": "Saudi Arabia",
+    "Mecca": "Saudi Arabia", "Makkah": "Saudi Arabia", "Medina": "Saudi Arabia", "Madinah": "Saudi Arabia",
+    "Doha": "Qatar", "Kuwait City": "Kuwait", "Kuwait": "Kuwait", "Manama": "Bahrain", "Muscat": "Oman",
+}
+COUNTRY_CURRENCIES = {"UAE": "AED", "Saudi Arabia": "SAR", "Qatar": "QAR", "Kuwait": "KWD", "Bahrain": "BHD",
+                      "Oman": "OMR"}
+
+
+def _key(name: Optional[str]) -> str:
+    return " ".join((name or "").strip().lower().split())
+
+
+_CITY_COUNTRIES = {_key(city): country for city, country in CITY_COUNTRIES.items()}
+
+
+def estimate_km(pickup: str, destination: str) -> int:
+    """
+    Trip distance for a quote. There is no maps provider yet, so this is a
+    stable stand-in (5-25 km, same answer for the same trip) instead of a
+    fresh random number per call.
+    """
+    digest = hashlib.sha256(f"{_key(pickup)}|{_key(destination)}".encode()).digest()
+    return 5 + digest[0] % 21
+
+
+class _Group:
+    """Rows of one city/country with their numeric columns as arrays (built once per refresh)."""
+
+    def __init__(self, rows: List[Dict[str, Any]], columns: Dict[str, str]):
+        self.rows = rows
+        for attr, field in columns.items():
+            setattr(self, attr, np.array([float(row.get(field) or 0) for row in rows]))
+
+
+class RideIndex:
+    """Ride products grouped by city and by country, with fare columns ready for quoting."""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        grouped = defaultdict(list)
+        self._names = {}  # display name per place key, as stored in the rows
+        for row in rows:
+            # Supabase rows are per city (`per_km`), mock_data rows per country (`rate_per_km`)
+            row = dict(row, rate_per_km=row.get("rate_per_km", row.get("per_km")))
+            for place in (row.get("city"), row.get("country")):
+                if place:
+                    grouped[_key(place)].append(row)
+                    self._names.setdefault(_key(place), place)
+        self._groups = {place: _Group(rows, {"base": "base_fare", "rate": "rate_per_km"})
+                        for place, rows in grouped.items()}
+        # Cities of a country with rides count too, for misheard names
+        for city, country in CITY_COUNTRIES.items():
+            if _key(country) in self._groups:
+                self._names.setdefault(_key(city), city)
+        self._places = FuzzyIndex([{"place": place} for place in sorted(self._names)], "place")
+
+    def resolve_city(self, city: str, threshold: int = 68) -> Optional[str]:
+        """The city/country with rides closest to a (possibly misheard) name, as stored; None if none is close."""
+        key = _key(city)
+        if self._group(key) is None:
+            match = self._places.match(key, threshold)
+            if not match:
+                return None
+            key = match["place"]
+        return self._names[key]
+
+    def _group(self, city: str) -> Optional[_Group]:
+        key = _key(city)
+        return self._groups.get(key) or self._groups.get(_key(_CITY_COUNTRIES.get(key)))
+
+    def quote(self, city: str, km: float, vehicle_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Every ride product available in `city` (or its country), priced for `km`, cheapest first."""
+        group = self._group(city)
+        if group is None:
+            return []
+        fares = group.base + group.rate * km
+        order = np.argsort(fares, kind="stable")
+        wanted = _key(vehicle_type)
+        quotes = []
+        for i in order:
+            row = group.rows[i]
+            if wanted and _key(row.get("type")) != wanted:
+                continue
+            quotes.append({
+                "id": row["id"],
+                "type": row.get("type"),
+                "service": row.get("service"),
+                "base_fare": float(group.base[i]),
+                "rate_per_km": float(group.rate[i]),
+                "fare": round(float(fares[i]), 3),
+                "currency": row.get("currency") or COUNTRY_CURRENCIES.get(row.get("country"), "KWD"),
+            })
+        return quotes
+
+    def vehicle_types(self, city: str) -> List[str]:
+        group = self._group(city)
+        return sorted({row.get("type") for row in group.rows if row.get("type")}) if group else []
+
+
+class HotelIndex:
+    """Hotels grouped by city, sorted by price, with star and price columns for filtering."""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        grouped = defaultdict(list)
+        for row in rows:
+            grouped[_key(row.get("city"))].append(row)
+        self._groups = {}
+        for city, city_rows in grouped.items():
+            city_rows.sort(key=lambda row: float(row.get("price_per_night") or 0))
+            self._groups[city] = _Group(city_rows, {"stars": "stars", "price": "price_per_night"})
+        self._cities = FuzzyIndex([{"city": city} for city in self.cities], "city")
+
+    def resolve_city(self, city: str, threshold: int = 68) -> Optional[str]:
+        """The hotel city closest to a (possibly misheard) name, as stored; None if none is close."""
+        group = self._groups.get(_key(city))
+        if group is not None:
+            return group.rows[0]["city"]
+        match = self._cities.match(city, threshold)
+        return match["city"] if match else None
+
+    def shortlist(self, city: str, min_stars: int = 0, max_stars: int = 5,
+                  min_price: float = 0, max_price: Optional[float] = None, limit: int = 5) -> List[Dict[str, Any]]:
+        """Cheapest hotels in `city` inside the star band and price range."""
+        group = self._groups.get(_key(city))
+        if group is None:
+            return []
+        mask = (group.stars >= min_stars) & (group.stars <= max_stars) & (group.price >= min_price)
+        if max_price is not None:
+            mask &= group.price <= max_price
+        return [group.rows[i] for i in np.flatnonzero(mask)[:limit]]
+
+    @property
+    def cities(self) -> List[str]:
+        return [group.rows[0]["city"] for group in self._groups.values()]
+
+
+class AvailabilityIndex(RefreshingIndex):
+    """The ride and hotel indexes, rebuilt together from their tables."""
+
+    def __init__(self, repository: DataBackend | None = None, ttl: float = AVAILABILITY_TTL):
+        super().__init__(repository, ttl)
+        self.rides = RideIndex([])
+        self.hotels = HotelIndex([])
+
+    async def _reload(self):
+        rides, hotels = await asyncio.gather(self.repository.list_rides(), self.repository.list_hotels())
+        # Swap whole indexes so readers never see a half-built one
+        self.rides, self.hotels = RideIndex(rides), HotelIndex(hotels)
+
+
+availability = AvailabilityIndex()
@@ -0,0 +1,290 @@
+# bench_load.py
+# Per-worker load test: N simultaneous sessions replay scripted text turns
+# through a real AgentSession + Assistant (no audio, no room), with a scripted
+# LLM that issues the function calls each turn needs. Reports throughput,
+# event-loop lag and turn tail latency as N rises, to size workers per node.
+#
+#   MOCK_LATENCY_MS=40 python bench_load.py --sessions 10 100 500 1000
+#   python bench_load.py --transcripts recorded.jsonl --llm-ms 600 --max-lag-ms 50
+#   LOOP_WATCHDOG=1 python bench_load.py --sessions 200     # log stacks of blocking calls while loaded
+#
+# Transcripts are JSONL, one conversation per line:
+#   {"name": "food", "turns": [{"user": "show me restaurants", "tools": [{"name": "show_all_restaurants", "arguments": {}}]}]}
+#
+# Turn latency is measured without the simulated LLM time, i.e. what the
+# worker itself adds (tools, DB, publish, framework) while N sessions share it.
+import os
+
+# Sessions share the process-wide repository; never point a load test at Supabase by accident
+os.environ.setdefault("DATA_BACKEND", "mock")
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from typing import Any, Dict, List, Tuple
+
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, AgentSession, llm
+
+import assistant
+from availability import availability
+from booking_writer import booking_writer
+from city_index import city_index
+from logs import setup_logging
+from loop_watchdog import LOOP_WATCHDOG, loop_watchdog
+from menu_cache import menu_cache
+from repository import get_repository
+from telemetry import current_session
+
+SESSIONS = [10, 50, 100, 250]
+# Event-loop lag probe period
+LAG_INTERVAL_MS = 20
+
+# (user text, [(tool, arguments), ...]) per turn; the LLM answers in text after the tools ran
+SCRIPTS: Dict[str, List[Tuple[str, List[Tuple[str, Dict[str, Any]]]]]] = {
+    "food": [
+        ("what restaurants are there", [("show_all_restaurants", {})]),
+        ("the first one", [("select_restaurant", {"restaurant_input": "1"})]),
+        ("two chicken shawarma plates", [("add_to_cart", {"item_input": "chicken shawarma plate", "quantity": 2})]),
+        ("I'll pay by card", [("show_payment_summary_food", {"payment_method": "card"})]),
+        ("yes confirm", [("confirm_food_order", {"confirm": True})]),
+    ],
+    "flight": [
+        ("one way from kuwait to dubai tomorrow",
+         [("collect_flight_details", {"from_city": "kuwait city", "to_city": "dubai", "departure_date": "tomorrow",
+                                      "trip_type": "one-way"})]),
+        ("one adult, no kids, economy",
+         [("collect_flight_details", {"adults": 1, "kids": 0, "flight_class": "economy"})]),
+        ("show me the flights", [("search_and_show_flights", {})]),
+        ("the first one", [("select_flight", {"user_input": "1"})]),
+        ("card", [("show_flight_payment", {"payment_method": "card"})]),
+        ("confirm", [("confirm_flight_booking", {"confirm": True})]),
+    ],
+    "ride": [
+        ("I need a ride from dubai mall to the airport",
+         [("search_rides", {"pickup": "Dubai Mall", "destination": "DXB airport", "city": "dubai"})]),
+        ("the cheapest one", [("book_ride", {"user_input": "1"})]),
+    ],
+    "hotel": [
+        ("a four star hotel in dubai from tomorrow for three nights",
+         [("search_hotels", {"city": "dubai", "check_in": "tomorrow", "check_out": "in 4 days", "min_stars": 4})]),
+        ("book the first one", [("book_hotel", {"user_input": "1"})]),
+    ],
+}
+
+
+def load_transcripts(path: str) -> Dict[str, list]:
+    scripts = {}
+    with open(path) as f:
+        for i, line in enumerate(f):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            scripts[entry.get("name") or f"transcript-{i + 1}"] = [
+                (turn["user"], [(tool["name"], tool.get("arguments", {})) for tool in turn.get("tools", [])])
+                for turn in entry["turns"]
+            ]
+    return scripts
+
+
+class ScriptedStream(llm.LLMStream):
+    def __init__(self, model: "ScriptedLLM", *, chat_ctx, tools, conn_options, calls, text):
+        super().__init__(model, chat_ctx=chat_ctx, tools=tools, conn_options=conn_options)
+        self._calls = calls
+        self._text = text
+
+    async def _run(self):
+        await asyncio.sleep(self._llm.think())
+        if self._calls:
+            delta = llm.ChoiceDelta(role="assistant", tool_calls=[
+                llm.FunctionToolCall(name=name, arguments=json.dumps(arguments), call_id=uuid.uuid4().hex)
+                for name, arguments in self._calls
+            ])
+        else:
+            delta = llm.ChoiceDelta(role="assistant", content=self._text)
+        self._event_ch.send_nowait(llm.ChatChunk(id=uuid.uuid4().hex, delta=delta))
+
+
+class ScriptedLLM(llm.LLM):
+    """
+    Stands in for the model of one session: the first generation of a turn
+    calls the scripted tools, the one after their output replies in text.
+    Each generation sleeps a jittered `ttft_ms` like a real first token.
+    """
+
+    def __init__(self, ttft_ms: float, jitter: float = 0.3):
+        super().__init__()
+        self.ttft_ms = ttft_ms
+        self.jitter = jitter
+        self.planned: List[Tuple[str, Dict[str, Any]]] = []
+        self.thinking = 0.0  # seconds slept this turn
+
+    def think(self) -> float:
+        delay = max(0.0, random.uniform(1 - self.jitter, 1 + self.jitter) * self.ttft_ms / 1000)
+        self.thinking += delay
+        return delay
+
+    def chat(self, *, chat_ctx, tools=None, conn_options=DEFAULT_API_CONNECT_OPTIONS, **kwargs) -> ScriptedStream:
+        last = chat_ctx.items[-1] if chat_ctx.items else None
+        calls, text = [], "Okay."
+        if last is not None and last.type == "function_call_output":
+            text = last.output[:200]
+        else:
+            calls, self.planned = self.planned, []
+        return ScriptedStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options,
+                              calls=calls, text=text)
+
+
+class StubParticipant:
+    """Stands in for LocalParticipant: accepts data packets and drops them."""
+
+    async def publish_data(self, payload, reliable=True, topic=None, **kwargs):
+        pass
+
+
+class LagProbe:
+    """Sleeps `interval` in a loop; how late each wake-up is = event-loop lag."""
+
+    def __init__(self, interval_ms: float = LAG_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.samples: List[float] = []
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, (loop.time() - start - self.interval) * 1000))
+
+    def __enter__(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+
+class Stage:
+    def __init__(self):
+        self.turns: List[float] = []
+        self.errors = 0
+        self.sessions_failed = 0
+
+
+async def run_session(name: str, script, stage: Stage, ttft_ms: float, think_ms: float, rounds: int):
+    current_session.set(f"load-{name}-{uuid.uuid4().hex[:8]}")
+    model = ScriptedLLM(ttft_ms)
+    session = AgentSession(llm=model)
+    session.userdata = {}
+    agent = assistant.Assistant(participant=StubParticipant(), repository=get_repository())
+    # Spread session starts over one think time so turns don't arrive in lockstep
+    await asyncio.sleep(random.uniform(0, think_ms / 1000))
+    try:
+        await session.start(agent)
+        for _ in range(rounds):
+            for text, calls in script:
+                model.planned, model.thinking = list(calls), 0.0
+                start = time.perf_counter()
+                result = await session.run(user_input=text)
+                stage.turns.append((time.perf_counter() - start - model.thinking) * 1000)
+                stage.errors += sum(1 for event in result.events
+                                    if event.type == "function_call_output" and event.item.is_error)
+                await asyncio.sleep(random.uniform(0.5, 1.5) * think_ms / 1000)
+    except Exception as e:
+        stage.sessions_failed += 1
+        print(f"session {name} failed: {type(e).__name__}: {e}", file=sys.stderr)
+    finally:
+        await session.aclose()
+
+
+def _quantiles(samples: List[float]) -> Dict[str, float]:
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return {"p50": value, "p95": value, "p99": value, "max": value}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98], "max": max(samples)}
+
+
+async def run_stage(sessions: int, scripts: Dict[str, list], args) -> Dict[str, Any]:
+    stage = Stage()
+    names = itertools.cycle(scripts)
+    start = time.perf_counter()
+    with LagProbe() as probe:
+        await asyncio.gather(*(
+            run_session(name, scripts[name], stage, args.llm_ms, args.think_ms, args.rounds)
+            for name in itertools.islice(names, sessions)
+        ))
+    elapsed = time.perf_counter() - start
+    return {
+        "sessions": sessions,
+        "turns": len(stage.turns),
+        "turns_per_s": len(stage.turns) / elapsed,
+        "turn_ms": _quantiles(stage.turns),
+        "lag_ms": _quantiles(probe.samples),
+        "tool_errors": stage.errors,
+        "sessions_failed": stage.sessions_failed,
+    }
+
+
+def prewarm():
+    """Same shared state a worker builds in agent.prewarm (no event loop running yet)."""
+    get_repository()
+    city_index.load()
+    menu_cache.warm()
+    availability.load()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Drive N simultaneous scripted sessions through one worker process")
+    parser.add_argument("--sessions", nargs="+", type=int, default=SESSIONS, help="concurrent sessions per stage")
+    parser.add_argument("--transcripts", help="JSONL conversations to replay instead of the built-in scripts")
+    parser.add_argument("--scripts", nargs="+", choices=list(SCRIPTS), help="subset of the built-in scripts")
+    parser.add_argument("--rounds", type=int, default=1, help="times each session replays its script")
+    parser.add_argument("--llm-ms", type=float, default=300, help="simulated LLM time to first token per generation")
+    parser.add_argument("--think-ms", type=float, default=1000, help="mean user pause between turns")
+    parser.add_argument("--max-lag-ms", type=float, default=100, help="loop lag p99 above which a stage is over capacity")
+    parser.add_argument("--json", help="also write the stage results to this file")
+    args = parser.parse_args()
+
+    scripts = load_transcripts(args.transcripts) if args.transcripts else \
+        {name: SCRIPTS[name] for name in args.scripts or SCRIPTS}
+
+    print(f"{'sessions':>8}{'turns':>8}{'turns/s':>9}{'turn p50':>10}{'p95':>9}{'p99':>9}"
+          f"{'lag p50':>9}{'p99':>8}{'max':>8}{'errors':>8}")
+    if LOOP_WATCHDOG:
+        loop_watchdog.start()
+    # One untimed session first: the framework imports and builds a lot lazily on first use
+    await run_stage(1, scripts, args)
+    results, ceiling = [], None
+    for sessions in args.sessions:
+        result = await run_stage(sessions, scripts, args)
+        results.append(result)
+        turn, lag = result["turn_ms"], result["lag_ms"]
+        print(f"{sessions:>8}{result['turns']:>8}{result['turns_per_s']:>9.1f}{turn['p50']:>10.1f}{turn['p95']:>9.1f}"
+              f"{turn['p99']:>9.1f}{lag['p50']:>9.1f}{lag['p99']:>8.1f}{lag['max']:>8.1f}"
+              f"{result['tool_errors'] + result['sessions_failed']:>8}")
+        if ceiling is None and lag["p99"] > args.max_lag_ms:
+            ceiling = sessions
+
+    if not await booking_writer.drain(timeout=10):
+        print(f"{booking_writer.pending} bookings still pending in the WAL", file=sys.stderr)
+    if ceiling is None:
+        print(f"Loop lag p99 stayed under {args.max_lag_ms:g} ms up to {args.sessions[-1]} sessions")
+    else:
+        print(f"Over capacity at {ceiling} sessions (loop lag p99 > {args.max_lag_ms:g} ms)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "stages": results}, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    prewarm()
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+# bench_startup.py
+# Worker cold-start benchmark: import time of our modules, checked against startup_budget.json.
+#
+#   python bench_startup.py            # check against the recorded budget (exit 1 on regression)
+#   python bench_startup.py --record   # re-record the budget from this machine
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+# Headroom applied when recording a new budget
+RECORD_HEADROOM = 1.5
+
+
+def import_time_ms(module: str) -> tuple[float, set]:
+    """Cumulative import time of `module` in a fresh interpreter, and every module it pulled in."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(BUDGET_FILE), check=True,
+    )
+    total_us, loaded = None, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        loaded.add(name)
+        if name == module:
+            total_us = int(cumulative)
+    return total_us / 1000, loaded
+
+
+def measure(module: str, runs: int) -> tuple[float, set]:
+    timings, loaded = [], set()
+    for _ in range(runs):
+        ms, loaded = import_time_ms(module)
+        timings.append(ms)
+    return statistics.median(timings), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check module import times against startup_budget.json")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--record", action="store_true", help="write measured times (+headroom) as the new budget")
+    args = parser.parse_args()
+
+    with open(BUDGET_FILE) as f:
+        budget = json.load(f)
+
+    failures = []
+    print(f"{'module':<14}{'median ms':>12}{'budget ms':>12}")
+    for module, limits in budget["modules"].items():
+        ms, loaded = measure(module, args.runs)
+        if args.record:
+            limits["max_ms"] = round(ms * RECORD_HEADROOM)
+        print(f"{module:<14}{ms:>12.1f}{limits['max_ms']:>12}")
+        if ms > limits["max_ms"]:
+            failures.append(f"{module}: {ms:.1f} ms > {limits['max_ms']} ms")
+        # Heavy libraries that must stay lazy (created on first use)
+        eager = [name for name in limits.get("lazy", []) if name in loaded]
+        if eager:
+            failures.append(f"{module}: imports {', '.join(eager)} eagerly")
+
+    if args.record:
+        with open(BUDGET_FILE, "w") as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+        print(f"Recorded budget in {BUDGET_FILE}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# bench_tokens.py
+# Token service load benchmark: a burst of session starts asking for join
+# tokens, one per request or in batches, in process or against a running server.
+#
+#   python bench_tokens.py                                    # Flask app in process, one client thread per --concurrency
+#   python bench_tokens.py --batch 1 5 --requests 5000
+#   gunicorn -w 4 -k gthread --threads 8 -b :8000 livekit_token_manager:app &
+#   python bench_tokens.py --url http://localhost:8000 --concurrency 64
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# In-process runs only need some credentials to sign with
+os.environ.setdefault("LIVEKIT_API_KEY", "bench-key")
+os.environ.setdefault("LIVEKIT_API_SECRET", "bench-secret-bench-secret-bench-secret")
+
+import httpx
+from livekit_token_manager import TOKEN_BATCH_MAX, app, mint_token
+
+
+def _request(i: int, batch: int):
+    """Path and JSON body for request `i`: the single-token GET, or a POST for `batch` participants."""
+    if batch == 1:
+        return f"/token/guest-{i}/order-{i % 1000}", None
+    return "/tokens", {"tokens": [{"name": f"guest-{i}-{j}", "room": f"order-{i % 1000}"} for j in range(batch)]}
+
+
+def run_in_process(requests: int, batch: int, concurrency: int) -> list:
+    client = app.test_client()
+
+    def call(i):
+        path, body = _request(i, batch)
+        start = time.perf_counter()
+        response = client.post(path, json=body) if body else client.get(path)
+        assert response.status_code == 200, response.text
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        return list(pool.map(call, range(requests)))
+
+
+async def run_http(url: str, requests: int, batch: int, concurrency: int) -> list:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(i):
+            path, body = _request(i, batch)
+            async with semaphore:
+                start = time.perf_counter()
+                response = await (client.post(path, json=body) if body else client.get(path))
+                response.raise_for_status()
+                return (time.perf_counter() - start) * 1000
+
+        return await asyncio.gather(*(call(i) for i in range(requests)))
+
+
+def mint_us(n: int = 2000) -> float:
+    """Microseconds per token minted, without the HTTP layer."""
+    start = time.perf_counter()
+    for i in range(n):
+        mint_token(f"guest-{i}", f"order-{i % 1000}")
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Token service throughput and latency")
+    parser.add_argument("--url", help="benchmark a running server instead of the app in process")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--batch", nargs="+", type=int, default=[1, TOKEN_BATCH_MAX],
+                        help=f"tokens per request (the service allows at most {TOKEN_BATCH_MAX})")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    if not args.url:
+        print(f"mint: {mint_us():.1f} us/token")
+
+    print(f"{'batch':>6}{'requests':>10}{'req/s':>10}{'tokens/s':>11}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for batch in args.batch:
+        requests = max(args.requests // batch, args.concurrency)
+        start = time.perf_counter()
+        if args.url:
+            timings = asyncio.run(run_http(args.url, requests, batch, args.concurrency))
+        else:
+            timings = run_in_process(requests, batch, args.concurrency)
+        elapsed = time.perf_counter() - start
+        cuts = statistics.quantiles(timings, n=100, method="inclusive")
+        print(f"{batch:>6}{requests:>10}{requests / elapsed:>10.0f}{requests * batch / elapsed:>11.0f}"
+              f"{cuts[49]:>9.2f}{cuts[94]:>9.2f}{cuts[98]:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
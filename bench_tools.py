@@ -0,0 +1,216 @@
+# bench_tools.py
+# Function-tool latency benchmark: drives the Assistant tools against synthetic
+# restaurant, menu and flight lists of growing size, checked against tool_budget.json.
+#
+#   python bench_tools.py                       # check against the recorded budget (exit 1 on regression)
+#   python bench_tools.py --record              # re-record the budget from this machine
+#   python bench_tools.py --tools add_to_cart --sizes 10 10000
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import assistant
+from city_index import city_index
+from menu_cache import menu_cache
+from mock_backend import MockRepository, generate_flights, generate_restaurants
+
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tool_budget.json")
+SIZES = [10, 100, 1000, 10000]
+# Headroom applied when recording a new budget (timings are noisier than allocations)
+RECORD_HEADROOM_MS = 2.0
+RECORD_HEADROOM_KB = 1.5
+# Smallest recorded p95 budget; below this scheduler noise dominates
+RECORD_FLOOR_MS = 0.5
+# Calls traced for allocations (tracemalloc slows calls down, so they are not timed)
+ALLOC_CALLS = 20
+
+
+class StubParticipant:
+    """Stands in for LocalParticipant: accepts data packets and drops them."""
+
+    async def publish_data(self, payload, reliable=True, topic=None, **kwargs):
+        pass
+
+
+class FakeSession:
+    def __init__(self):
+        self.userdata = {}
+
+
+class FakeRunContext:
+    """The only part of RunContext the tools use is `session.userdata`."""
+
+    def __init__(self):
+        self.session = FakeSession()
+
+
+def _assistant() -> assistant.Assistant:
+    return assistant.Assistant(participant=StubParticipant(), repository=MockRepository(latency_ms=0))
+
+
+def _context(**fields) -> FakeRunContext:
+    context = FakeRunContext()
+    userdata = context.session.userdata["userdata"] = assistant.SessionData()
+    userdata.passengers = [{"type": "adult", "count": 2}, {"type": "kid", "count": 0}]
+    for name, value in fields.items():
+        setattr(userdata, name, value)
+    return context
+
+
+def _typo(name: str) -> str:
+    """Drop one inner letter, like a mis-heard word."""
+    return name[:2] + name[3:] if len(name) > 4 else name
+
+
+# Each case builds its agent, context and data for one collection size and
+# returns `call(i)`, awaited once per iteration.
+
+def case_select_restaurant(size: int):
+    restaurants, menus = generate_restaurants(size, 20)
+    for restaurant in restaurants[:50]:
+        # The ones picked below; menus are prefetched in a real session
+        menu_cache._menus.set(("menu", restaurant["id"]), menus[restaurant["id"]])
+    agent = _assistant()
+    context = _context(available_restaurants=restaurants)
+    names = [_typo(restaurant["name"].lower()) for restaurant in restaurants[:50]]
+
+    async def call(i):
+        await agent.select_restaurant(context, names[i % len(names)])
+    return call
+
+
+def case_add_to_cart(size: int):
+    restaurants, menus = generate_restaurants(1, size)
+    menu = next(iter(menus.values()))
+    agent = _assistant()
+    context = _context(selected_restaurant=restaurants[0], menu_items=menu)
+    phrases = ["add two {}", "I want {}", "change {} to 3", "remove the {}"]
+    names = [_typo(item["name"].lower()) for item in menu[:50]]
+
+    async def call(i):
+        await agent.add_to_cart(context, phrases[i % len(phrases)].format(names[i % len(names)]))
+    return call
+
+
+def case_select_flight(size: int):
+    flights = generate_flights(size)
+    agent = _assistant()
+    context = _context(available_flights=flights)
+    inputs = ["1", "qatar airway", "emirats", "3", "the gulf air one", "flynas"]
+
+    async def call(i):
+        await agent.select_flight(context, inputs[i % len(inputs)])
+    return call
+
+
+def case_collect_flight_details(size: int):
+    city_index._build(generate_flights(size))
+    city_index._loaded_at = time.monotonic()  # fresh: ensure_loaded keeps the generated index
+    agent = _assistant()
+    context = _context()
+    requests = [
+        {"from_city": "kuwait city", "to_city": "dubay", "departure_date": "next friday"},
+        {"from_city": "riyad", "to_city": "doha", "departure_date": "tomorrow", "flight_class": "business"},
+        {"from_city": "abu dhabi", "to_city": "muscat", "departure_date": "25 december", "adults": 2, "kids": 0},
+    ]
+
+    async def call(i):
+        await agent.collect_flight_details(context, **requests[i % len(requests)])
+    return call
+
+
+CASES = {
+    "select_restaurant": case_select_restaurant,
+    "add_to_cart": case_add_to_cart,
+    "select_flight": case_select_flight,
+    "collect_flight_details": case_collect_flight_details,
+}
+
+
+def _percentile(cuts, p):
+    return cuts[p - 1]
+
+
+async def run_case(name: str, size: int, iterations: int, warmup: int) -> dict:
+    call = CASES[name](size)
+    for i in range(warmup):
+        await call(i)
+
+    timings = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await call(i)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    allocated = []
+    for i in range(ALLOC_CALLS):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        await call(i)
+        allocated.append((tracemalloc.get_traced_memory()[1] - before) / 1024)
+    tracemalloc.stop()
+
+    cuts = statistics.quantiles(timings, n=100, method="inclusive")
+    return {
+        "p50": _percentile(cuts, 50),
+        "p95": _percentile(cuts, 95),
+        "p99": _percentile(cuts, 99),
+        "alloc_kb": statistics.median(allocated),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Check function-tool latency against tool_budget.json")
+    parser.add_argument("--tools", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--record", action="store_true", help="write measured p95/allocations (+headroom) as the new budget")
+    args = parser.parse_args()
+
+    budget = {"tools": {}}
+    if os.path.exists(BUDGET_FILE):
+        with open(BUDGET_FILE) as f:
+            budget = json.load(f)
+
+    failures = []
+    print(f"{'tool':<24}{'size':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'alloc KB':>10}{'budget':>16}")
+    for name in args.tools:
+        for size in args.sizes:
+            result = await run_case(name, size, args.iterations, args.warmup)
+            key = f"{name}/{size}"
+            limits = budget["tools"].get(key)
+            if args.record:
+                limits = budget["tools"][key] = {
+                    "p95_ms": round(max(result["p95"] * RECORD_HEADROOM_MS, RECORD_FLOOR_MS), 3),
+                    "alloc_kb": round(result["alloc_kb"] * RECORD_HEADROOM_KB, 1),
+                }
+            limit_text = f"{limits['p95_ms']} / {limits['alloc_kb']}" if limits else "-"
+            print(f"{name:<24}{size:>7}{result['p50']:>10.3f}{result['p95']:>10.3f}{result['p99']:>10.3f}"
+                  f"{result['alloc_kb']:>10.1f}{limit_text:>16}")
+            if not limits:
+                continue
+            if result["p95"] > limits["p95_ms"]:
+                failures.append(f"{key}: p95 {result['p95']:.3f} ms > {limits['p95_ms']} ms")
+            if result["alloc_kb"] > limits["alloc_kb"]:
+                failures.append(f"{key}: {result['alloc_kb']:.1f} KB/call > {limits['alloc_kb']} KB")
+
+    if args.record:
+        with open(BUDGET_FILE, "w") as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+        print(f"Recorded budget in {BUDGET_FILE}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
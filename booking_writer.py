@@ -0,0 +1,296 @@
+# booking_writer.py
+# Confirmed bookings are written through a local write-ahead log and flushed
+# to the bookings table in batches, off the voice turn.
+#
+#   submit()  -> row appended + fsynced to the WAL, queued; the tool answers now
+#   flusher   -> up to BOOKING_BATCH_SIZE rows per insert_bookings call,
+#                transient errors retried with exponential backoff until the
+#                database takes them; a batch the database rejects (4xx,
+#                constraint/validation error) is split until the bad rows are
+#                found, and those go to the dead-letter file instead
+#
+# Every row carries a deterministic idempotency_key (see booking_key), and the
+# batch insert skips keys already stored, so a retried confirm tool call or a
+# re-sent batch never creates a second booking.
+import asyncio
+import fcntl
+import glob
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from repository import DataBackend, get_repository
+from resilience import rejected
+
+logger = logging.getLogger("booking_writer")
+
+BOOKING_WAL_DIR = os.getenv("BOOKING_WAL_DIR", "wal")
+BOOKING_BATCH_SIZE = int(os.getenv("BOOKING_BATCH_SIZE", "50"))
+# How long the flusher waits for more rows before writing a partial batch
+BOOKING_FLUSH_INTERVAL = float(os.getenv("BOOKING_FLUSH_INTERVAL", "0.2"))
+# Retry backoff: base * 2^attempt with full jitter, capped
+BOOKING_RETRY_BASE = float(os.getenv("BOOKING_RETRY_BASE", "0.5"))
+BOOKING_RETRY_MAX = float(os.getenv("BOOKING_RETRY_MAX", "30"))
+# Rows the database rejected, one JSON line each, for someone to look at
+BOOKING_DEAD_LETTER = os.getenv("BOOKING_DEAD_LETTER", "dead-letter.jsonl")
+
+BOOKING_NAMESPACE = uuid.UUID("6f1c4a53-5b0e-4c1e-9a55-3f4b2f0d7c21")
+# Fields that identify an order; booking_date etc. change between retries
+_KEY_FIELDS = ("booking_type", "item_id", "booking_details", "total_price", "currency")
+
+
+def booking_key(session_id: str, order_seq: int, booking: Dict[str, Any]) -> str:
+    """
+    Same session + same order number + same contents -> same key, however
+    often the tool is retried; the same order placed again (a new search,
+    so a new order_seq) gets a new key.
+    """
+    order = json.dumps([booking.get(name) for name in _KEY_FIELDS], sort_keys=True, default=str)
+    digest = hashlib.sha256(order.encode()).hexdigest()
+    return str(uuid.uuid5(BOOKING_NAMESPACE, f"{session_id}:{order_seq}:{digest}"))
+
+
+def booking_reference(key: str, prefix: str) -> str:
+    """Short reference read out to the user, e.g. FL-6F1C4A53."""
+    return f"{prefix}-{key[:8].upper()}"
+
+
+class BookingWAL:
+    """
+    Append-only JSONL log owned by one worker process (held with flock).
+    Lines are {"row": {...}} when a booking is queued and {"done": [keys]}
+    once a batch is stored; the file is truncated whenever nothing is pending.
+    """
+
+    def __init__(self, directory: str = BOOKING_WAL_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, f"bookings-{os.getpid()}.wal")
+        self._file = open(self.path, "a+")
+        fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _append(self, entry: Dict[str, Any]):
+        self._file.write(json.dumps(entry, default=str) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()  # also drops the flock
+
+    def append(self, row: Dict[str, Any]):
+        self._append({"row": row})
+
+    def dead_letter(self, row: Dict[str, Any], error: str, path: str = BOOKING_DEAD_LETTER):
+        with open(os.path.join(self.directory, path), "a") as f:
+            f.write(json.dumps({"ts": time.time(), "error": error, "row": row}, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def done(self, keys: List[str], pending: int):
+        if pending:
+            self._append({"done": keys})
+        else:
+            self._file.truncate(0)
+            os.fsync(self._file.fileno())
+
+    @staticmethod
+    def _pending(path: str) -> List[Dict[str, Any]]:
+        rows, done = {}, set()
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from a crash mid-write
+                if "row" in entry:
+                    rows[entry["row"]["idempotency_key"]] = entry["row"]
+                else:
+                    done.update(entry["done"])
+        return [row for key, row in rows.items() if key not in done]
+
+    def recover(self) -> List[Dict[str, Any]]:
+        """Take over rows left in logs of dead workers (their lock is free) and in our own."""
+        pending = self._pending(self.path)
+        for path in glob.glob(os.path.join(self.directory, "bookings-*.wal")):
+            if path == self.path:
+                continue
+            with open(path) as f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # a live worker owns it
+                orphaned = self._pending(path)
+                for row in orphaned:
+                    self.append(row)
+                pending.extend(orphaned)
+                os.remove(path)
+        return pending
+
+
+class BookingWriter:
+    """
+    Process-wide booking pipeline. WAL writes run on a single thread (in
+    order, off the event loop); the flusher task starts with the first submit.
+    """
+
+    def __init__(self, repository: DataBackend | None = None, wal_dir: str = BOOKING_WAL_DIR,
+                 batch_size: int = BOOKING_BATCH_SIZE, flush_interval: float = BOOKING_FLUSH_INTERVAL):
+        self._repository = repository
+        self.wal_dir = wal_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._wal: Optional[BookingWAL] = None
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="booking-wal")
+        self._queue: Optional[asyncio.Queue] = None
+        self._starting: Optional[asyncio.Future] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._pending = 0
+        self._keys = set()  # idempotency keys queued or in flight
+
+    @property
+    def repository(self) -> DataBackend:
+        return self._repository or get_repository()
+
+    @property
+    def pending(self) -> int:
+        """Rows queued or in flight, not yet stored."""
+        return self._pending
+
+    async def _run_io(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._io, fn, *args)
+
+    async def _start(self):
+        self._queue = asyncio.Queue()
+        wal = await self._run_io(BookingWAL, self.wal_dir)
+        try:
+            recovered = await self._run_io(wal.recover)
+        except BaseException:
+            # Let go of the lock so the next start can take the same log again
+            await self._run_io(wal.close)
+            raise
+        self._wal = wal
+        if recovered:
+            logger.warning("re-queueing %d bookings from the write-ahead log", len(recovered))
+        for row in recovered:
+            self._keys.add(row["idempotency_key"])
+            self._pending += 1
+            self._queue.put_nowait(row)
+        self._start_flusher()
+
+    def _start_flusher(self):
+        self._flusher = asyncio.create_task(self._flush_loop())
+        self._flusher.add_done_callback(self._flusher_done)
+
+    @staticmethod
+    def _flusher_done(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("booking flusher stopped", exc_info=task.exception())
+
+    async def submit(self, row: Dict[str, Any]):
+        """Returns once the row is durable in the WAL; the database write happens later."""
+        if self._starting is None:
+            self._starting = asyncio.ensure_future(self._start())
+        starting = self._starting
+        try:
+            # Shielded: a cancelled submit must not cancel the start other submits wait on
+            await asyncio.shield(starting)
+        except Exception:
+            if self._starting is starting:
+                self._starting = None  # failed start (WAL dir, lock, recovery): the next submit tries again
+            raise
+        if self._flusher.done():
+            self._start_flusher()  # stopped by something the loop didn't catch: queued rows still need it
+        key = row["idempotency_key"]
+        if key in self._keys:
+            return  # the same order confirmed again before it was stored
+        # Counted before the WAL write so a concurrent flush never truncates under it
+        self._keys.add(key)
+        self._pending += 1
+        try:
+            await self._run_io(self._wal.append, row)
+        except Exception:
+            self._keys.discard(key)
+            self._pending -= 1
+            raise
+        self._queue.put_nowait(row)
+
+    async def _next_batch(self) -> List[Dict[str, Any]]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        """Store `batch`, retrying transient errors; rows the database rejects end up in the dead-letter file."""
+        attempt = 0
+        while True:
+            try:
+                await self.repository.insert_bookings(batch)
+                return
+            except Exception as e:
+                if rejected(e):
+                    error = e
+                    break
+                delay = random.uniform(0, min(BOOKING_RETRY_MAX, BOOKING_RETRY_BASE * 2 ** attempt))
+                attempt += 1
+                logger.exception("booking batch of %d failed (attempt %d), retrying in %.1fs",
+                                 len(batch), attempt, delay)
+                await asyncio.sleep(delay)
+        if len(batch) > 1:
+            # Split to find the rejected rows; the rest of the batch is still stored
+            middle = len(batch) // 2
+            await self._write(batch[:middle])
+            await self._write(batch[middle:])
+            return
+        logger.error("booking %s rejected (%s: %s), moved to the dead-letter file",
+                     batch[0]["idempotency_key"], type(error).__name__, error)
+        await self._run_io(self._wal.dead_letter, batch[0], f"{type(error).__name__}: {error}")
+
+    async def _flush_loop(self):
+        failures = 0
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write(batch)
+            except Exception:
+                # e.g. the dead-letter file can't be written: the rows are still in the WAL, try them again
+                delay = random.uniform(0, min(BOOKING_RETRY_MAX, BOOKING_RETRY_BASE * 2 ** failures))
+                failures += 1
+                logger.exception("booking flush of %d rows failed, re-queued, next try in %.1fs", len(batch), delay)
+                for row in batch:
+                    self._queue.put_nowait(row)
+                await asyncio.sleep(delay)
+                continue
+            failures = 0
+            keys = [row["idempotency_key"] for row in batch]
+            self._keys.difference_update(keys)
+            self._pending -= len(batch)
+            try:
+                await self._run_io(self._wal.done, keys, self._pending)
+            except Exception:
+                # Stored anyway; a replay after a crash only re-sends keys the insert skips
+                logger.exception("could not mark %d stored bookings done in the write-ahead log", len(keys))
+
+    async def drain(self, timeout: float = 5.0) -> bool:
+        """Wait (up to `timeout`) for queued rows to be stored; anything left stays in the WAL."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._pending and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        return not self._pending
+
+
+booking_writer = BookingWriter()
@@ -0,0 +1,96 @@
+# cart.py
+# Food cart with O(1) line lookup and running totals in exact KWD (3 decimals).
+import uuid
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, Iterator, List, Optional
+
+KWD = Decimal("0.001")
+
+
+def money(value: Any) -> Decimal:
+    """Price as an exact 3-decimal amount ("1.25", 1.25 and 1.250 are all 1.250)."""
+    return Decimal(str(value or 0)).quantize(KWD, rounding=ROUND_HALF_UP)
+
+
+class CartLine:
+    __slots__ = ("id", "item", "quantity", "unit_price", "total", "currency")
+
+    def __init__(self, item: Dict[str, Any], quantity: int):
+        self.id = str(uuid.uuid4())
+        self.item = item
+        self.quantity = quantity
+        self.unit_price = money(item["price"])
+        self.total = self.unit_price * quantity
+        self.currency = item.get("currency", "KWD")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Line as sent to the client and stored with bookings: the menu item is referenced, not embedded."""
+        return {
+            "id": self.id,
+            "itemId": self.item["id"],
+            "name": self.item["name"],
+            "price": float(self.unit_price),
+            "quantity": self.quantity,
+            "total": float(self.total),
+            "currency": self.currency,
+        }
+
+
+class Cart:
+    """
+    Lines keyed by menu item id, with item count and subtotal kept up to date
+    on every change, so lookups, edits and summaries don't scan the cart.
+    """
+
+    def __init__(self):
+        self._lines: Dict[Any, CartLine] = {}
+        self._count = 0
+        self._subtotal = Decimal(0)
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __iter__(self) -> Iterator[CartLine]:
+        return iter(self._lines.values())
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def subtotal(self) -> Decimal:
+        return self._subtotal
+
+    def get(self, item_id: Any) -> Optional[CartLine]:
+        return self._lines.get(item_id)
+
+    def set_quantity(self, item: Dict[str, Any], quantity: int) -> Optional[CartLine]:
+        """Set a line's quantity, creating or removing it as needed; returns the line (None once removed)."""
+        line = self._lines.get(item["id"])
+        if quantity <= 0:
+            if line:
+                self.remove(item["id"])
+            return None
+        if line is None:
+            line = CartLine(item, 0)
+            self._lines[item["id"]] = line
+        self._count += quantity - line.quantity
+        new_total = line.unit_price * quantity
+        self._subtotal += new_total - line.total
+        line.quantity = quantity
+        line.total = new_total
+        return line
+
+    def add(self, item: Dict[str, Any], quantity: int) -> Optional[CartLine]:
+        line = self._lines.get(item["id"])
+        return self.set_quantity(item, (line.quantity if line else 0) + quantity)
+
+    def remove(self, item_id: Any) -> Optional[CartLine]:
+        line = self._lines.pop(item_id, None)
+        if line:
+            self._count -= line.quantity
+            self._subtotal -= line.total
+        return line
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [line.to_dict() for line in self._lines.values()]
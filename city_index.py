@@ -0,0 +1,54 @@
+# city_index.py
+# Process-wide city name <-> airport code index, shared by every session on a worker.
+import os
+from typing import Dict, Optional, Tuple
+
+from refreshing import RefreshingIndex
+from repository import DataBackend
+
+CITY_INDEX_TTL = float(os.getenv("CITY_INDEX_TTL", "900"))
+
+
+def normalize_city(name: str) -> str:
+    return " ".join(name.strip().lower().split())
+
+
+class CityIndex(RefreshingIndex):
+    """City name <-> airport code lookups, built from the city codes table."""
+
+    def __init__(self, repository: DataBackend | None = None, ttl: float = CITY_INDEX_TTL):
+        super().__init__(repository, ttl)
+        self._codes: Dict[str, str] = {}  # normalized name -> code
+        self._names: Dict[str, str] = {}  # code -> display name
+
+    def _build(self, rows):
+        codes, names = {}, {}
+        for row in rows:
+            for city_field, code_field in (("from_city", "from_city_code"), ("to_city", "to_city_code")):
+                city, code = row.get(city_field), row.get(code_field)
+                if not city or not code:
+                    continue
+                code = code.strip().upper()
+                codes[normalize_city(city)] = code
+                names.setdefault(code, city.strip())
+        # Swap whole dicts so readers never see a half-built index
+        self._codes, self._names = codes, names
+
+    async def _reload(self):
+        self._build(await self.repository.fetch_city_codes())
+
+    def lookup(self, name_or_code: str) -> Optional[Tuple[str, str]]:
+        """Return (city name, code) for a city name or an airport code."""
+        if not name_or_code:
+            return None
+        key = normalize_city(name_or_code)
+        code = self._codes.get(key)
+        if code:
+            return name_or_code.strip(), code
+        code = key.upper()
+        if code in self._names:
+            return self._names[code], code
+        return None
+
+
+city_index = CityIndex()
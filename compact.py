@@ -0,0 +1,91 @@
+# compact.py
+# Model-facing view of a tool result. The client gets the full json_response
+# through _publish; the LLM only needs enough to talk about it, so its copy
+# keeps the message and the scalar/identifying fields within a token budget.
+import json
+import os
+from typing import Any, Dict
+
+# Default budget per tool result, and per-action budgets (overridable as JSON, e.g. '{"9": 800}')
+TOOL_RESULT_TOKENS = int(os.getenv("TOOL_RESULT_TOKENS", "300"))
+TOOL_RESULT_BUDGETS = {8: 400, 9: 600}  # restaurant list, menu
+TOOL_RESULT_BUDGETS.update({int(action): int(tokens)
+                            for action, tokens in json.loads(os.getenv("TOOL_RESULT_BUDGETS", "{}")).items()})
+# Rough size of a token for budgeting (no tokenizer at runtime)
+CHARS_PER_TOKEN = 4
+
+# Result lists (flights, restaurants, menu items, cart lines, ride options, hotels) and the
+# fields of their rows worth showing the model, id first so it can refer back to a row;
+# everything else in those rows is client-only. Other lists (e.g. passengers) pass through.
+RECORD_LISTS = ("flights", "restaurants", "items", "cart", "options", "hotels")
+ROW_FIELDS = ("id", "name", "airline", "to_city", "departure_time", "cuisine", "area", "price", "quantity", "total",
+              "type", "fare", "stars", "price_per_night", "currency")
+MORE_ON_SCREEN = "… {} more on screen"
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False, default=str))
+
+
+def trim_text(text: str, chars: int) -> str:
+    """Keep the first lines and the closing question, replacing the middle with a count."""
+    if not text or len(text) <= chars:
+        return text
+    head, _, tail = text.rpartition("\n\n")
+    if not head or len(tail) > chars // 2:
+        head, tail = text, ""
+    lines = head.split("\n")
+    kept, used = [], len(tail) + len(MORE_ON_SCREEN) + 8
+    for line in lines:
+        if used + len(line) + 1 > chars:
+            break
+        kept.append(line)
+        used += len(line) + 1
+    kept.append(MORE_ON_SCREEN.format(len(lines) - len(kept)))
+    return "\n".join(kept) + (f"\n\n{tail}" if tail else "")
+
+
+def _compact_value(value: Any, key: str | None = None) -> Any:
+    if isinstance(value, dict):
+        if "version" in value:
+            return None  # versioned client state block (publisher.collection)
+        return {k: v for k, v in ((k, _compact_value(v, k)) for k, v in value.items()) if v is not None}
+    if isinstance(value, list) and key in RECORD_LISTS:
+        return [{k: row[k] for k in ROW_FIELDS if k in row} if isinstance(row, dict) else row for row in value]
+    return value
+
+
+def _lists(data: Dict[str, Any]):
+    for key, value in data.items():
+        if isinstance(value, list) and value:
+            yield len(value), key, data
+        elif isinstance(value, dict):
+            yield from _lists(value)
+
+
+def _fit(data: Dict[str, Any], chars: int) -> Dict[str, Any]:
+    """Halve the longest list (at any depth) until `data` fits; a list cut to nothing becomes a count."""
+    while _size(data) > chars:
+        lists = list(_lists(data))
+        if not lists:
+            return {}
+        length, key, parent = max(lists, key=lambda entry: entry[0])
+        keep = length // 2
+        parent[key] = parent[key][:keep] if keep else f"{length} shown on screen"
+    return data
+
+
+def for_llm(res: Dict[str, Any], budget_tokens: int | None = None) -> Dict[str, Any]:
+    """Compact copy of a json_response for the model, within its token budget."""
+    budget = budget_tokens or TOOL_RESULT_BUDGETS.get(res.get("action"), TOOL_RESULT_TOKENS)
+    chars = budget * CHARS_PER_TOKEN
+    message = trim_text(res.get("message") or "", chars)
+    out = {"status": res.get("status"), "action": res.get("action"), "message": message}
+    data = res.get("data")
+    if isinstance(data, dict):
+        compact = _fit(_compact_value(data), chars - _size(out))
+        if compact:
+            out["data"] = compact
+    elif data is not None and _size(data) <= chars - _size(out):
+        out["data"] = data
+    return out
@@ -0,0 +1,77 @@
+# context_window.py
+# Keeps the LLM chat context bounded without disturbing its cacheable prefix.
+#
+# The prefix (instructions + tool schemas) never changes, and between
+# compactions the history only grows at the end, so every turn re-uses the
+# provider's cached prompt. Once the history crosses CONTEXT_MAX_TOKENS, older
+# tool outputs are cut down to one line and, if that isn't enough, the oldest
+# turns are dropped; the prefix stays byte-identical either way.
+import ast
+import os
+from typing import Optional
+
+from livekit.agents import ChatContext
+
+CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "4000"))
+# Most recent items that are never summarized or dropped
+CONTEXT_KEEP_ITEMS = int(os.getenv("CONTEXT_KEEP_ITEMS", "12"))
+# Rough size of a token (see compact.CHARS_PER_TOKEN)
+CHARS_PER_TOKEN = 4
+SUMMARY_CHARS = 160
+
+
+def _is_instructions(item) -> bool:
+    return item.type == "message" and item.role in ("system", "developer")
+
+
+def _item_chars(item) -> int:
+    if item.type == "message":
+        return len(item.text_content or "")
+    if item.type == "function_call":
+        return len(item.name) + len(item.arguments)
+    if item.type == "function_call_output":
+        return len(item.output)
+    return 0
+
+
+def estimate_tokens(chat_ctx: ChatContext) -> int:
+    """Tokens of the history after the instructions."""
+    return sum(_item_chars(item) for item in chat_ctx.items if not _is_instructions(item)) // CHARS_PER_TOKEN
+
+
+def summarize_output(output: str) -> str:
+    """One line for an old tool output: its status and the first line of its message."""
+    try:
+        result = ast.literal_eval(output)  # livekit stores dict results as str(dict)
+    except (ValueError, SyntaxError):
+        result = None
+    if isinstance(result, dict) and "message" in result:
+        first_line = (result.get("message") or "").strip().split("\n", 1)[0]
+        return f"[{result.get('status')}] {first_line}"[:SUMMARY_CHARS]
+    return output[:SUMMARY_CHARS]
+
+
+def compact(chat_ctx: ChatContext, max_tokens: int = CONTEXT_MAX_TOKENS,
+            keep_items: int = CONTEXT_KEEP_ITEMS) -> bool:
+    """Shrink `chat_ctx` in place if it is over `max_tokens`; returns whether it changed."""
+    if estimate_tokens(chat_ctx) <= max_tokens:
+        return False
+    items = chat_ctx.items
+    for i, item in enumerate(items[:-keep_items] if keep_items else items):
+        if item.type == "function_call_output" and len(item.output) > SUMMARY_CHARS:
+            items[i] = item.model_copy(update={"output": summarize_output(item.output)})
+    if estimate_tokens(chat_ctx) > max_tokens:
+        # Keeps the leading instructions and never starts on an orphaned tool call/output
+        chat_ctx.truncate(max_items=keep_items)
+    return True
+
+
+def reset_flow(chat_ctx: ChatContext, note: Optional[str] = None) -> ChatContext:
+    """
+    Context for starting a new flow: the same instruction items (so the cached
+    prefix still matches) plus an optional assistant note about what just happened.
+    """
+    fresh = ChatContext([item for item in chat_ctx.items if _is_instructions(item)])
+    if note:
+        fresh.add_message(role="assistant", content=note)
+    return fresh
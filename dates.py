@@ -0,0 +1,124 @@
+# dates.py
+# Spoken travel dates -> calendar dates, with a precompiled fast path ahead of dateparser.
+import os
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+# Languages dateparser may try for anything the fast path doesn't cover
+DATE_LANGUAGES = [lang.strip() for lang in os.getenv("DATE_LANGUAGES", "en,ar").split(",") if lang.strip()]
+DATE_CACHE_SIZE = int(os.getenv("DATE_CACHE_SIZE", "2048"))
+
+_RELATIVE_DAYS = {
+    "today": 0, "tonight": 0, "tomorrow": 1, "day after tomorrow": 2,
+    "اليوم": 0, "الليلة": 0, "غدا": 1, "غداً": 1, "بكرة": 1, "بكره": 1, "بعد غد": 2, "بعد بكرة": 2, "بعد بكره": 2,
+}
+
+_WEEKDAYS = {
+    "monday": 0, "mon": 0, "tuesday": 1, "tue": 1, "tues": 1, "wednesday": 2, "wed": 2,
+    "thursday": 3, "thu": 3, "thurs": 3, "friday": 4, "fri": 4, "saturday": 5, "sat": 5, "sunday": 6, "sun": 6,
+    "الاثنين": 0, "الإثنين": 0, "الثلاثاء": 1, "الأربعاء": 2, "الاربعاء": 2, "الخميس": 3,
+    "الجمعة": 4, "الجمعه": 4, "السبت": 5, "الأحد": 6, "الاحد": 6,
+}
+
+_MONTHS = {
+    "january": 1, "jan": 1, "february": 2, "feb": 2, "march": 3, "mar": 3, "april": 4, "apr": 4,
+    "may": 5, "june": 6, "jun": 6, "july": 7, "jul": 7, "august": 8, "aug": 8,
+    "september": 9, "sep": 9, "sept": 9, "october": 10, "oct": 10, "november": 11, "nov": 11,
+    "december": 12, "dec": 12,
+    "يناير": 1, "فبراير": 2, "مارس": 3, "أبريل": 4, "ابريل": 4, "مايو": 5, "يونيو": 6,
+    "يوليو": 7, "أغسطس": 8, "اغسطس": 8, "سبتمبر": 9, "أكتوبر": 10, "اكتوبر": 10, "نوفمبر": 11, "ديسمبر": 12,
+}
+
+_NEXT_WORDS = r"(?:next|coming|القادم|القادمة|الجاي|الجاية)"
+_THIS_WORDS = r"(?:this|on|هذا|يوم)"
+_WEEKDAY_ALT = "|".join(sorted(map(re.escape, _WEEKDAYS), key=len, reverse=True))
+_MONTH_ALT = "|".join(sorted(map(re.escape, _MONTHS), key=len, reverse=True))
+
+_IN_DAYS_RE = re.compile(r"^in (\d{1,3}) days?$")
+_WEEKDAY_RE = re.compile(rf"^(?:(?:{_NEXT_WORDS}|{_THIS_WORDS})\s+)?(?P<day>{_WEEKDAY_ALT})(?:\s+{_NEXT_WORDS})?$")
+_DAY_MONTH_RE = re.compile(rf"^(?:the\s+)?(?P<day>\d{{1,2}})(?:st|nd|rd|th)?(?:\s+of)?\s+(?P<month>{_MONTH_ALT})(?:\s+(?P<year>\d{{4}}))?$")
+_MONTH_DAY_RE = re.compile(rf"^(?P<month>{_MONTH_ALT})\s+(?:the\s+)?(?P<day>\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(?P<year>\d{{4}}))?$")
+_ISO_RE = re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})$")
+_NUMERIC_RE = re.compile(r"^(\d{1,2})[/.](\d{1,2})(?:[/.](\d{2,4}))?$")  # day/month[/year], as written in the Gulf
+
+
+def _normalize(text: str) -> str:
+    text = text.strip().lower().replace(",", " ")
+    return " ".join(text.split())
+
+
+def _future_day_month(today: date, day: int, month: int, year: Optional[int]) -> Optional[date]:
+    try:
+        if year:
+            return date(year if year > 99 else 2000 + year, month, day)
+        candidate = date(today.year, month, day)
+        return candidate if candidate >= today else date(today.year + 1, month, day)
+    except ValueError:
+        return None
+
+
+def _fast_path(text: str, today: date) -> Optional[date]:
+    if text in _RELATIVE_DAYS:
+        return today + timedelta(days=_RELATIVE_DAYS[text])
+
+    m = _IN_DAYS_RE.match(text)
+    if m:
+        return today + timedelta(days=int(m.group(1)))
+
+    m = _WEEKDAY_RE.match(text)
+    if m:
+        # "Friday" / "next Friday": the first one after today
+        ahead = (_WEEKDAYS[m.group("day")] - today.weekday()) % 7 or 7
+        return today + timedelta(days=ahead)
+
+    m = _DAY_MONTH_RE.match(text) or _MONTH_DAY_RE.match(text)
+    if m:
+        year = int(m.group("year")) if m.group("year") else None
+        return _future_day_month(today, int(m.group("day")), _MONTHS[m.group("month")], year)
+
+    m = _ISO_RE.match(text)
+    if m:
+        try:
+            return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+        except ValueError:
+            return None
+
+    m = _NUMERIC_RE.match(text)
+    if m:
+        year = int(m.group(3)) if m.group(3) else None
+        return _future_day_month(today, int(m.group(1)), int(m.group(2)), year)
+    return None
+
+
+def _dateparser_parse(text: str, today: date) -> Optional[date]:
+    import dateparser
+
+    parsed = dateparser.parse(text, languages=DATE_LANGUAGES, settings={
+        "PREFER_DATES_FROM": "future",
+        "RELATIVE_BASE": datetime.combine(today, datetime.min.time()),
+    })
+    return parsed.date() if parsed else None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _resolve(text: str, today: date) -> Optional[date]:
+    return _fast_path(text, today) or _dateparser_parse(text, today)
+
+
+def resolve_date(text: str, today: Optional[date] = None) -> Optional[date]:
+    """
+    Resolve "tomorrow", "next Friday", "25 December", "الجمعة" etc. to a date,
+    preferring the future. Results are memoized per (phrase, reference day).
+    """
+    if not text or not text.strip():
+        return None
+    return _resolve(_normalize(text), today or date.today())
+
+
+def warm():
+    """Pay dateparser's first-use cost (imports, language data, regexes) up front."""
+    today = date.today()
+    for phrase in ("25 of the month after next", "بعد ثلاثة أيام"):
+        _dateparser_parse(phrase, today)
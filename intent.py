@@ -0,0 +1,113 @@
+# intent.py
+# Compiled add/remove/change intent detection for cart edits.
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from rapidfuzz import fuzz, process
+
+WORD_RE = re.compile(r"\w+")
+
+# Single keywords, checked per word in this priority order (change > remove > add)
+INTENT_KEYWORDS: Dict[str, List[str]] = {
+    "change": ["change", "make", "set", "to", "just", "only", "want", "get", "like", "have", "give", "me", "please"],
+    "remove": ["remove", "delete", "cancel", "minus", "less", "no more", "take out", "without"],
+    "add": ["add", "plus", "more", "another", "extra", "and"],
+}
+
+# Multi-word phrases, matched exactly on consecutive non-menu words
+INTENT_PHRASES: Dict[str, List[str]] = {
+    "remove": ["no more", "take out", "take off", "get rid of"],
+    "change": ["make it", "set to", "i want", "give me", "i'd like", "let me have", "can i get"],
+    "add": ["one more", "add another"],
+}
+
+INTENT_THRESHOLD = 65
+DEFAULT_INTENT = "change"  # most natural: "Margherita", "I want pizza", "four cokes"
+INTENT_CACHE_SIZE = 256
+
+
+def _tokens(text: str) -> List[str]:
+    return WORD_RE.findall(text.lower())
+
+
+# Keyword lexicon compiled once: one flat choice list plus the intent of each column
+_KEYWORDS: List[str] = []
+_KEYWORD_INTENTS: List[str] = []
+for _intent, _words in INTENT_KEYWORDS.items():
+    _KEYWORDS.extend(_words)
+    _KEYWORD_INTENTS.extend([_intent] * len(_words))
+_INTENT_ORDER = list(INTENT_KEYWORDS)
+
+# Exact phrase/keyword table keyed by token tuple, longest phrases tried first;
+# an exact hit ("another") wins over a fuzzy hit on a higher-priority intent
+_PHRASES: Dict[Tuple[str, ...], str] = {}
+for _table in (INTENT_KEYWORDS, INTENT_PHRASES):
+    for _intent, _phrases in _table.items():
+        for _phrase in _phrases:
+            _PHRASES.setdefault(tuple(_tokens(_phrase)), _intent)
+_PHRASE_LENGTHS = sorted({len(p) for p in _PHRASES}, reverse=True)
+
+
+class IntentClassifier:
+    """
+    Detects add/remove/change without confusing menu item names.
+    The menu vocabulary is tokenized once per menu; each utterance is then
+    one set lookup per word, a phrase scan and a single cdist over the
+    remaining words against the keyword lexicon.
+    """
+
+    def __init__(self, menu_names: Iterable[str]):
+        self.vocabulary = frozenset(token for name in menu_names for token in _tokens(name))
+
+    def _is_menu_word(self, word: str) -> bool:
+        vocab = self.vocabulary
+        if word in vocab:
+            return True
+        # Spoken plurals: "cokes", "sandwiches"
+        return (word.endswith("s") and word[:-1] in vocab) or (word.endswith("es") and word[:-2] in vocab)
+
+    def detect(self, user_input: str) -> str:
+        words = _tokens(user_input)
+        # None marks a menu word, which also breaks phrase adjacency
+        safe = [None if self._is_menu_word(w) else w for w in words]
+        safe_words = [w for w in safe if w is not None]
+        if not safe_words:
+            return DEFAULT_INTENT
+
+        scores = process.cdist(safe_words, _KEYWORDS, scorer=fuzz.WRatio, score_cutoff=INTENT_THRESHOLD)
+        row = 0
+        for pos, word in enumerate(safe):
+            if word is None:
+                continue
+            for length in _PHRASE_LENGTHS:
+                phrase = tuple(safe[pos:pos + length])
+                if len(phrase) == length and phrase in _PHRASES:
+                    return _PHRASES[phrase]
+            hits = {_KEYWORD_INTENTS[col] for col in scores[row].nonzero()[0]}
+            for intent in _INTENT_ORDER:
+                if intent in hits:
+                    return intent
+            row += 1
+        return DEFAULT_INTENT
+
+
+_classifier_cache: "OrderedDict[int, Tuple[Sequence, IntentClassifier]]" = OrderedDict()
+
+
+def classifier_for(menu: Sequence[Dict], key: str = "name") -> IntentClassifier:
+    """Cached classifier per menu list (same identity rules as matching.index_for)."""
+    entry = _classifier_cache.get(id(menu))
+    if entry is not None and entry[0] is menu:
+        _classifier_cache.move_to_end(id(menu))
+        return entry[1]
+    classifier = IntentClassifier(item[key] for item in menu)
+    _classifier_cache[id(menu)] = (menu, classifier)
+    if len(_classifier_cache) > INTENT_CACHE_SIZE:
+        _classifier_cache.popitem(last=False)
+    return classifier
+
+
+def detect_intent(user_input: str, menu_names: Sequence[str]) -> str:
+    """One-off detection for callers without a cached menu."""
+    return IntentClassifier(menu_names).detect(user_input)
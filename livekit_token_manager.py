@@ -1,25 +1,88 @@
-# server.py
+# livekit_token_manager.py
+# Join-token service for the web client.
+#
+#   gunicorn -w 4 -k gthread --threads 8 -b 0.0.0.0:8000 livekit_token_manager:app
+#   python livekit_token_manager.py          # Flask dev server, local use only
+#
+#   GET  /token/<name>/<room>[?ttl=600]       -> the JWT as text
+#   POST /tokens  {"ttl": 600, "tokens": [{"name": "Sara", "room": "order-17"}, ...]}
+#                                             -> {"tokens": [{"name", "room", "identity", "token", "expires_at"}]}
+#
+# Every token gets a fresh uuid4 identity: callers choose the display name and
+# room, never who they join as. The API key and secret are read once per process.
 import datetime
+import functools
 import os
+import time
 import uuid
 
+from dotenv import load_dotenv
+from flask import Flask, abort, jsonify, request
 from livekit import api
-from flask import Flask
+
+load_dotenv(".env")
+
+# Seconds a token is valid for when the request doesn't say, and the most it may ask for
+TOKEN_TTL = int(os.getenv("TOKEN_TTL", "3600"))
+TOKEN_MAX_TTL = int(os.getenv("TOKEN_MAX_TTL", "86400"))
+# Most tokens per POST /tokens (a client joining with a few participants, not a token farm)
+TOKEN_BATCH_MAX = int(os.getenv("TOKEN_BATCH_MAX", "10"))
 
 app = Flask(__name__)
 
 
+@functools.lru_cache(maxsize=1)
+def _credentials() -> tuple[str, str]:
+    api_key, api_secret = os.getenv("LIVEKIT_API_KEY"), os.getenv("LIVEKIT_API_SECRET")
+    if not api_key or not api_secret:
+        raise RuntimeError("LIVEKIT_API_KEY and LIVEKIT_API_SECRET must be set")
+    return api_key, api_secret
+
+
+def mint_token(name: str, room: str, ttl: int = TOKEN_TTL) -> dict:
+    """A join token for `room` under a new random identity."""
+    identity = str(uuid.uuid4())
+    expires_at = int(time.time()) + ttl
+    token = api.AccessToken(*_credentials()) \
+        .with_identity(identity) \
+        .with_name(name) \
+        .with_ttl(datetime.timedelta(seconds=ttl)) \
+        .with_grants(api.VideoGrants(room_join=True, room=room)) \
+        .to_jwt()
+    return {"name": name, "room": room, "identity": identity, "token": token, "expires_at": expires_at}
+
+
+def _ttl(value) -> int:
+    if value is None:
+        return TOKEN_TTL
+    try:
+        ttl = int(value)
+    except (TypeError, ValueError):
+        abort(400, description=f"ttl must be a number of seconds, got {value!r}")
+    return min(max(ttl, 1), TOKEN_MAX_TTL)
+
+
 @app.route('/token/<name>/<room>')
 def get_token(name, room):
-    token = api.AccessToken(os.getenv('LIVEKIT_API_KEY'), os.getenv('LIVEKIT_API_SECRET')) \
-        .with_identity(str(uuid.uuid4())) \
-        .with_name(name) \
-        .with_ttl(datetime.timedelta(days=30)) \
-        .with_grants(api.VideoGrants(
-        room_join=True,
-        room=room,
-    ))
-    return token.to_jwt()
+    return mint_token(name, room, _ttl(request.args.get("ttl")))["token"]
+
+
+@app.route('/tokens', methods=['POST'])
+def get_tokens():
+    body = request.get_json(silent=True) or {}
+    wanted = body.get("tokens")
+    if not isinstance(wanted, list) or not wanted:
+        abort(400, description='expected {"tokens": [{"name": ..., "room": ...}, ...]}')
+    if len(wanted) > TOKEN_BATCH_MAX:
+        abort(400, description=f"at most {TOKEN_BATCH_MAX} tokens per request")
+    default_ttl = _ttl(body.get("ttl"))
+    tokens = []
+    for entry in wanted:
+        if not isinstance(entry, dict) or not entry.get("room"):
+            abort(400, description="every token needs a room")
+        ttl = _ttl(entry["ttl"]) if "ttl" in entry else default_ttl
+        tokens.append(mint_token(str(entry.get("name") or ""), str(entry["room"]), ttl))
+    return jsonify({"tokens": tokens})
 
 
 if __name__ == '__main__':
@@ -0,0 +1,76 @@
+# logs.py
+# Queued, structured logging for the worker. Records are tagged with the
+# session and function tool (from the telemetry contextvars), formatted once
+# and put on a queue; a QueueListener thread hands them to the real handlers
+# (livekit's JSON/IPC handler under `agent.py start`, stdout otherwise), so
+# writing a log line never blocks the event loop.
+#
+#   LOG_LEVEL=DEBUG LOG_PAYLOAD_SAMPLE=0.05 python agent.py start
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+from telemetry import current_session, current_tool
+
+# Root level; empty keeps the level livekit's CLI set (--log-level), INFO when run standalone
+LOG_LEVEL = os.getenv("LOG_LEVEL", "")
+# Longest message passed on (tracebacks and stack dumps included)
+LOG_MAX_CHARS = int(os.getenv("LOG_MAX_CHARS", "4000"))
+# Share of published payloads logged at DEBUG, and how much of each one
+LOG_PAYLOAD_SAMPLE = float(os.getenv("LOG_PAYLOAD_SAMPLE", "0.1"))
+LOG_PAYLOAD_CHARS = int(os.getenv("LOG_PAYLOAD_CHARS", "512"))
+
+_listener: Optional[QueueListener] = None
+
+
+def _cut(text: str, limit: int) -> str:
+    return text if len(text) <= limit else f"{text[:limit]}… [{len(text) - limit} chars cut]"
+
+
+class ContextQueueHandler(QueueHandler):
+    """Runs in the logging task: tag with session/tool, format once, truncate, enqueue."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Read here: contextvars are only visible from the task that logged
+        record.session = current_session.get() or None
+        record.tool = current_tool.get() or None
+        record = super().prepare(record)
+        record.msg = record.message = _cut(record.msg, LOG_MAX_CHARS)
+        return record
+
+
+def setup_logging():
+    """Put a queue in front of the root handlers, once per process."""
+    global _listener
+    if _listener is not None:
+        return
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    if not handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(session)s] %(message)s"))
+        handlers = [handler]
+        root.setLevel(logging.INFO)
+    if LOG_LEVEL:
+        root.setLevel(LOG_LEVEL.upper())
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    log_queue = queue.SimpleQueue()
+    root.addHandler(ContextQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def log_payload(logger: logging.Logger, message: str, payload: Any, **fields):
+    """DEBUG-log a sample of payloads, cut to LOG_PAYLOAD_CHARS; nothing is serialized unless sampled."""
+    if not logger.isEnabledFor(logging.DEBUG) or random.random() >= LOG_PAYLOAD_SAMPLE:
+        return
+    text = json.dumps(payload, default=str, ensure_ascii=False, separators=(",", ":"))
+    logger.debug("%s %s", message, _cut(text, LOG_PAYLOAD_CHARS), extra=fields)
@@ -0,0 +1,141 @@
+# loop_watchdog.py
+# Opt-in event-loop watchdog for the agent worker. A heartbeat task ticks on
+# the loop; a daemon thread watches it. When the loop misses its beat for
+# longer than LOOP_WATCHDOG_MS, the thread logs the loop thread's stack while
+# it is still stuck, tagged with the session and function tool of the task
+# that was running, so blocking calls can be traced back to assistant.py.
+#
+#   LOOP_WATCHDOG=1 LOOP_WATCHDOG_MS=50 python agent.py start
+#
+# The worst lag per LOOP_WATCHDOG_WINDOW is also recorded as a `loop_lag`
+# telemetry span, so stalls show up next to the per-turn latencies.
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from telemetry import current_session, current_tool, telemetry
+
+logger = logging.getLogger("loop_watchdog")
+
+# Code object of asyncio.Handle._run, the frame every loop callback runs under
+_HANDLE_RUN = asyncio.Handle._run.__code__
+
+LOOP_WATCHDOG = os.getenv("LOOP_WATCHDOG", "0") == "1"
+# A callback holding the loop longer than this gets its stack logged
+LOOP_WATCHDOG_MS = float(os.getenv("LOOP_WATCHDOG_MS", "100"))
+# Heartbeat period; also the watchdog thread's polling period
+LOOP_WATCHDOG_INTERVAL_MS = float(os.getenv("LOOP_WATCHDOG_INTERVAL_MS", "20"))
+# Seconds per `loop_lag` telemetry sample (the worst lag seen in the window)
+LOOP_WATCHDOG_WINDOW = float(os.getenv("LOOP_WATCHDOG_WINDOW", "1"))
+# Innermost frames kept per stack dump
+LOOP_WATCHDOG_FRAMES = int(os.getenv("LOOP_WATCHDOG_FRAMES", "25"))
+
+
+def _callback_frames(frame):
+    """Frames of the callback the loop is running (outermost first) and the asyncio Handle it runs in."""
+    frames = []
+    while frame is not None:
+        if frame.f_code is _HANDLE_RUN:
+            handle = frame.f_locals.get("self")
+            return frames[::-1], handle if isinstance(handle, asyncio.Handle) else None
+        frames.append(frame)
+        frame = frame.f_back
+    return frames[::-1], None
+
+
+def _tags(loop: asyncio.AbstractEventLoop, handle: Optional[asyncio.Handle]) -> dict:
+    """Session and tool from the context the callback runs in (every task step and call_soon has one)."""
+    context = getattr(handle, "_context", None)
+    task = asyncio.current_task(loop)
+    return {
+        "session": (context.get(current_session) or None) if context is not None else None,
+        "tool": (context.get(current_tool) or None) if context is not None else None,
+        "task": task.get_name() if task is not None else None,  # None: a plain callback
+    }
+
+
+class LoopWatchdog:
+    """One per worker process, watching the loop it was started on."""
+
+    def __init__(self, threshold_ms: float = LOOP_WATCHDOG_MS, interval_ms: float = LOOP_WATCHDOG_INTERVAL_MS,
+                 window: float = LOOP_WATCHDOG_WINDOW, frames: int = LOOP_WATCHDOG_FRAMES):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.window = window
+        self.frames = frames
+        self.stalls = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._beat = 0.0
+        self._stall: Optional[dict] = None  # tags of the stall being reported, recorded once it ends
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and not self._stop.is_set()
+
+    def start(self):
+        """Start watching the running loop; no-op if already watching it."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self.running:
+            return
+        self._loop, self._loop_thread = loop, threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        telemetry.tag_tools = True
+        loop.create_task(self._heartbeat(), name="loop-watchdog")
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+        logger.info("loop watchdog on (threshold %.0f ms)", self.threshold * 1000)
+
+    def stop(self):
+        self._stop.set()
+
+    async def _heartbeat(self):
+        worst, window_start = 0.0, time.monotonic()
+        while not self._stop.is_set():
+            self._beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = now - self._beat - self.interval
+            worst = max(worst, lag)
+            stall, self._stall = self._stall, None
+            if stall is not None:
+                # Recorded here rather than from the watchdog thread, with the full duration
+                telemetry.record("loop_stall", lag * 1000, session=stall["session"] or "", tool=stall["tool"])
+            if now - window_start >= self.window:
+                telemetry.record("loop_lag", max(0.0, worst) * 1000, session="", tool=None)
+                worst, window_start = 0.0, now
+
+    def _watch(self):
+        reported = None  # beat of the stall already dumped
+        while not self._stop.wait(self.interval):
+            beat = self._beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.threshold:
+                if reported is not None and beat != reported:
+                    reported = None
+                continue
+            if beat == reported:
+                continue
+            reported = beat
+            self._dump(blocked)
+
+    def _dump(self, blocked: float):
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+        frames, handle = _callback_frames(frame)
+        tags = self._stall = _tags(self._loop, handle)
+        self.stalls += 1
+        stack = "".join(traceback.StackSummary.extract(
+            (frame, frame.f_lineno) for frame in frames[-self.frames:]).format())
+        logger.warning("event loop blocked for %.0f ms (session=%s tool=%s task=%s), still running:\n%s",
+                       blocked * 1000, tags["session"], tags["tool"], tags["task"], stack)
+
+
+loop_watchdog = LoopWatchdog()
@@ -0,0 +1,78 @@
+# matching.py
+# Precompiled fuzzy matching over the small record lists the tools pick from.
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from rapidfuzz import fuzz, process
+
+FUZZY_INDEX_CACHE_SIZE = 256
+
+
+def normalize(text: str) -> str:
+    return text.strip().lower()
+
+
+class FuzzyIndex:
+    """
+    Choices are normalized once and matched by position, so a lookup is a
+    single rapidfuzz call with no per-query list building or index() scan.
+    """
+
+    def __init__(self, records: Sequence[Dict[str, Any]], key: str, scorer=fuzz.WRatio):
+        self.source = records
+        self.records = list(records)
+        self.key = key
+        self.scorer = scorer
+        self.choices = [normalize(str(r[key])) for r in self.records]
+
+    def __len__(self):
+        return len(self.records)
+
+    def match(self, query: str, threshold: int = 70) -> Optional[Dict[str, Any]]:
+        if not self.choices or not query:
+            return None
+        result = process.extractOne(normalize(query), self.choices, scorer=self.scorer, score_cutoff=threshold)
+        if result is None:
+            return None
+        return self.records[result[2]]
+
+    def extract(self, query: str, limit: int = 5, threshold: int = 0) -> List[Tuple[Dict[str, Any], float]]:
+        """Best `limit` records for one query, highest score first."""
+        if not self.choices or not query:
+            return []
+        results = process.extract(normalize(query), self.choices, scorer=self.scorer,
+                                  limit=limit, score_cutoff=threshold)
+        return [(self.records[idx], score) for _, score, idx in results]
+
+    def match_many(self, queries: Sequence[str], threshold: int = 70) -> List[Optional[Dict[str, Any]]]:
+        """Best record (or None) for each query, scored in one cdist pass."""
+        if not self.choices or not queries:
+            return [None] * len(queries)
+        scores = process.cdist([normalize(q) for q in queries], self.choices,
+                               scorer=self.scorer, score_cutoff=threshold)
+        matches = []
+        for row in scores:
+            best = int(row.argmax())
+            matches.append(self.records[best] if row[best] >= threshold and row[best] > 0 else None)
+        return matches
+
+
+_index_cache: "OrderedDict[Tuple[int, str], FuzzyIndex]" = OrderedDict()
+
+
+def index_for(records: Sequence[Dict[str, Any]], key: str) -> FuzzyIndex:
+    """
+    Cached FuzzyIndex for a record list (menus, search results, ...).
+    Entries hold a reference to their list, so its id() cannot be reused
+    while cached; a different list object always gets a fresh index.
+    """
+    cache_key = (id(records), key)
+    index = _index_cache.get(cache_key)
+    if index is not None and index.source is records:
+        _index_cache.move_to_end(cache_key)
+        return index
+    index = FuzzyIndex(records, key)
+    _index_cache[cache_key] = index
+    if len(_index_cache) > FUZZY_INDEX_CACHE_SIZE:
+        _index_cache.popitem(last=False)
+    return index
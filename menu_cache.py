@@ -0,0 +1,109 @@
+# menu_cache.py
+# Process-wide restaurant list and menu cache, shared by every session on a worker.
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+from repository import DataBackend, get_repository
+
+MENU_CACHE_TTL = float(os.getenv("MENU_CACHE_TTL", "600"))
+MENU_CACHE_SIZE = int(os.getenv("MENU_CACHE_SIZE", "200"))
+# Menus loaded at worker start, and prefetched right after the list is shown
+MENU_WARM_COUNT = int(os.getenv("MENU_WARM_COUNT", "10"))
+MENU_PREFETCH_COUNT = int(os.getenv("MENU_PREFETCH_COUNT", "3"))
+
+
+class TTLCache:
+    """Size-bounded LRU whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._items: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        entry = self._items.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._items[key] = (time.monotonic() + self.ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+
+class MenuCache:
+    """
+    Restaurants and menus change rarely and every caller sees the same data,
+    so one copy per process serves all sessions. Concurrent misses for the
+    same key share a single query. Cached lists are shared: treat them as
+    read-only.
+    """
+
+    def __init__(self, repository: DataBackend | None = None,
+                 ttl: float = MENU_CACHE_TTL, max_menus: int = MENU_CACHE_SIZE):
+        self._repository = repository
+        self._restaurants = TTLCache(ttl, 1)
+        self._menus = TTLCache(ttl, max_menus)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    @property
+    def repository(self) -> DataBackend:
+        return self._repository or get_repository()
+
+    async def _load(self, cache: TTLCache, key: Hashable, fetch):
+        value = cache.get(key)
+        if value is not None:
+            return value
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded: a caller cancelled mid-wait must not cancel the query other callers share
+        value = await asyncio.shield(task)
+        if value:
+            cache.set(key, value)
+        return value
+
+    async def restaurants(self) -> List[Dict[str, Any]]:
+        return await self._load(self._restaurants, "restaurants", self.repository.list_restaurants)
+
+    async def menu(self, restaurant_id: Any) -> List[Dict[str, Any]]:
+        return await self._load(self._menus, ("menu", restaurant_id),
+                                lambda: self.repository.get_menu(restaurant_id))
+
+    def cached_menu(self, restaurant_id: Any) -> Optional[List[Dict[str, Any]]]:
+        return self._menus.get(("menu", restaurant_id))
+
+    def prefetch(self, restaurant_ids: Iterable[Any]):
+        """Load menus in the background so the next selection is a cache hit."""
+        for restaurant_id in restaurant_ids:
+            if self.cached_menu(restaurant_id) is None and ("menu", restaurant_id) not in self._inflight:
+                task = asyncio.create_task(self.menu(restaurant_id))
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def _warm(self, count: int):
+        restaurants = await self.restaurants()
+        # Highest-rated first when the table has ratings, table order otherwise
+        popular = sorted(restaurants, key=lambda r: r.get("rating") or 0, reverse=True)[:count]
+        await asyncio.gather(*(self.menu(r["id"]) for r in popular))
+
+    def warm(self, count: int = MENU_WARM_COUNT):
+        """Blocking warm-up for the worker prewarm hook (no event loop running yet)."""
+        asyncio.run(self._warm(count))
+
+
+menu_cache = MenuCache()
@@ -0,0 +1,214 @@
+# mock_backend.py
+# In-memory DataBackend built from mock_data.py, for offline load and latency testing.
+#
+#   DATA_BACKEND=mock python agent.py console
+#   MOCK_LATENCY_MS=40 MOCK_RESTAURANTS=2000 MOCK_MENU_SIZE=50 MOCK_FLIGHTS=10000 ...
+import asyncio
+import json
+import os
+import random
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import mock_data
+from availability import CITY_COUNTRIES
+from repository import FLIGHT_PAGE_SIZE
+from telemetry import telemetry
+
+# Mean synthetic latency per call, +/- MOCK_JITTER (fraction of the mean)
+MOCK_LATENCY_MS = float(os.getenv("MOCK_LATENCY_MS", "0"))
+MOCK_JITTER = float(os.getenv("MOCK_JITTER", "0.5"))
+# Extra synthetic rows on top of mock_data (0 = mock_data only)
+MOCK_RESTAURANTS = int(os.getenv("MOCK_RESTAURANTS", "0"))
+MOCK_MENU_SIZE = int(os.getenv("MOCK_MENU_SIZE", "30"))
+MOCK_FLIGHTS = int(os.getenv("MOCK_FLIGHTS", "0"))
+
+# City -> (airport code, country); covers every city in mock_data
+CITIES = {
+    "Dubai": ("DXB", "UAE"), "Abu Dhabi": ("AUH", "UAE"),
+    "Riyadh": ("RUH", "Saudi Arabia"), "Jeddah": ("JED", "Saudi Arabia"), "Dammam": ("DMM", "Saudi Arabia"),
+    "Doha": ("DOH", "Qatar"), "Kuwait City": ("KWI", "Kuwait"), "Manama": ("BAH", "Bahrain"),
+    "Muscat": ("MCT", "Oman"), "Cairo": ("CAI", "Egypt"),
+}
+CURRENCIES = {"UAE": "AED", "Saudi Arabia": "SAR", "Qatar": "QAR", "Kuwait": "KWD", "Bahrain": "BHD",
+              "Oman": "OMR", "Egypt": "EGP"}
+AIRLINES = ["Emirates", "Etihad Airways", "FlyDubai", "Qatar Airways", "Kuwait Airways", "Saudia",
+            "Flynas", "Gulf Air", "Oman Air", "Flyadeal"]
+DISHES = ["Shawarma", "Mandi", "Kabsa", "Machboos", "Biryani", "Falafel", "Hummus", "Mixed Grill", "Kebab",
+          "Fattoush", "Tabbouleh", "Manakeesh", "Harees", "Luqaimat", "Kunafa", "Burger", "Pizza", "Wrap"]
+STYLES = ["Chicken", "Lamb", "Beef", "Fish", "Shrimp", "Veggie", "Spicy", "Classic", "Family", "Mini"]
+
+
+def _departure_time(seed: str) -> str:
+    rng = random.Random(seed)
+    return f"{rng.randrange(0, 24):02d}:{rng.choice((0, 15, 30, 45)):02d}"
+
+
+def _arrival_time(departure: str, seed: str) -> str:
+    hours, minutes = map(int, departure.split(":"))
+    total = hours * 60 + minutes + random.Random(seed + "a").randrange(60, 300, 5)
+    return f"{total // 60 % 24:02d}:{total % 60:02d}"
+
+
+def _flight(flight_id: str, from_city: str, to_city: str, price: float, airline: str) -> Dict[str, Any]:
+    departure = _departure_time(flight_id)
+    return {
+        "id": flight_id,
+        "airline": airline,
+        "from_city": from_city,
+        "from_city_code": CITIES[from_city][0],
+        "to_city": to_city,
+        "to_city_code": CITIES[to_city][0],
+        "flight_date": None,  # mock flights operate daily
+        "departure_time": departure,
+        "arrival_time": _arrival_time(departure, flight_id),
+        "price": float(price),
+        "currency": CURRENCIES[CITIES[from_city][1]],
+    }
+
+
+def base_flights() -> List[Dict[str, Any]]:
+    return [_flight(f["id"], f["from"], f["to"], f["price"], f["airline"]) for f in mock_data.flights]
+
+
+def base_restaurants() -> Tuple[List[Dict[str, Any]], Dict[Any, List[Dict[str, Any]]]]:
+    """mock_data.food_menu grouped into restaurant rows and per-restaurant menus."""
+    restaurants, menus, ids = [], defaultdict(list), {}
+    for dish in mock_data.food_menu:
+        if dish["restaurant"] not in ids:
+            ids[dish["restaurant"]] = len(ids) + 1
+            restaurants.append({"id": ids[dish["restaurant"]], "name": dish["restaurant"],
+                                "cuisine": "Arabic", "area": dish["country"]})
+        restaurant_id = ids[dish["restaurant"]]
+        menus[restaurant_id].append({"id": dish["id"], "name": dish["name"], "price": float(dish["price"]),
+                                     "restaurantID": restaurant_id,
+                                     "currency": CURRENCIES[dish["country"]]})
+    return restaurants, menus
+
+
+def generate_flights(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """`count` synthetic flights spread over every route between the mock cities."""
+    rng = random.Random(seed)
+    cities = list(CITIES)
+    flights = []
+    for n in range(count):
+        from_city, to_city = rng.sample(cities, 2)
+        flights.append(_flight(f"GF{n:06d}", from_city, to_city, rng.randrange(300, 2500, 5), rng.choice(AIRLINES)))
+    return flights
+
+
+def generate_restaurants(count: int, menu_size: int, seed: int = 7, start_id: int = 1000):
+    """`count` synthetic restaurants with `menu_size` distinct items each."""
+    rng = random.Random(seed)
+    countries = sorted({country for _, country in CITIES.values()} - {"Egypt"})
+    restaurants, menus = [], {}
+    combos = [f"{style} {dish}" for style in STYLES for dish in DISHES]
+    for n in range(count):
+        restaurant_id = start_id + n
+        country = rng.choice(countries)
+        restaurants.append({"id": restaurant_id, "name": f"{rng.choice(DISHES)} House {n}",
+                            "cuisine": rng.choice(DISHES), "area": country})
+        names = rng.sample(combos, min(menu_size, len(combos)))
+        names += [f"Special {i}" for i in range(menu_size - len(names))]
+        menus[restaurant_id] = [
+            {"id": f"m{restaurant_id}-{i}", "name": name, "price": round(rng.uniform(0.5, 12), 3),
+             "restaurantID": restaurant_id, "currency": CURRENCIES[country]}
+            for i, name in enumerate(names)
+        ]
+    return restaurants, menus
+
+
+class MockRepository:
+    """
+    DataBackend over mock_data.py (plus optional generated rows) with the same
+    filtering, ordering and cursor semantics as SupabaseRepository, and an
+    optional synthetic latency per call.
+    """
+
+    def __init__(self, latency_ms: float = MOCK_LATENCY_MS, jitter: float = MOCK_JITTER,
+                 restaurants: int = MOCK_RESTAURANTS, menu_size: int = MOCK_MENU_SIZE,
+                 flights: int = MOCK_FLIGHTS, seed: int = 7):
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self.flights = base_flights() + generate_flights(flights, seed)
+        self.restaurants, self.menus = base_restaurants()
+        extra_restaurants, extra_menus = generate_restaurants(restaurants, menu_size, seed)
+        self.restaurants += extra_restaurants
+        self.menus.update(extra_menus)
+        self.bookings: List[Dict[str, Any]] = []
+
+        self._routes = defaultdict(list)
+        for flight in self.flights:
+            self._routes[(flight["from_city_code"], flight["to_city_code"])].append(flight)
+        for route in self._routes.values():
+            route.sort(key=lambda f: (f["price"], f["id"]))
+
+    async def _latency(self, name: str):
+        if self.latency_ms > 0:
+            spread = self.latency_ms * self.jitter
+            with telemetry.span("db", query=name):
+                await asyncio.sleep(max(0.0, self._rng.uniform(self.latency_ms - spread, self.latency_ms + spread)) / 1000)
+
+    async def fetch_city_codes(self) -> List[Dict[str, Any]]:
+        await self._latency("fetch_city_codes")
+        return [{k: f[k] for k in ("from_city", "from_city_code", "to_city", "to_city_code")} for f in self.flights]
+
+    async def search_flights(
+            self,
+            from_city_code: str,
+            to_city_code: str,
+            departure_date: str | None = None,
+            flight_class: str | None = None,
+            limit: int = FLIGHT_PAGE_SIZE,
+            cursor: str | None = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        await self._latency("search_flights")
+        after = tuple(json.loads(cursor)) if cursor else None
+        rows = []
+        for flight in self._routes.get((from_city_code, to_city_code), ()):
+            if after and (flight["price"], flight["id"]) <= after:
+                continue
+            rows.append(dict(flight, flight_date=departure_date or date.today().isoformat()))
+            if len(rows) > limit:
+                break
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = json.dumps([rows[-1]["price"], rows[-1]["id"]])
+        return rows, next_cursor
+
+    async def list_restaurants(self) -> List[Dict[str, Any]]:
+        await self._latency("list_restaurants")
+        return list(self.restaurants)
+
+    async def get_menu(self, restaurant_id: Any) -> List[Dict[str, Any]]:
+        await self._latency("get_menu")
+        return list(self.menus.get(restaurant_id, ()))
+
+    async def list_rides(self) -> List[Dict[str, Any]]:
+        await self._latency("list_rides")
+        return list(mock_data.rides)
+
+    async def list_hotels(self) -> List[Dict[str, Any]]:
+        await self._latency("list_hotels")
+        return [dict(hotel, currency=CURRENCIES[CITY_COUNTRIES[hotel["city"]]]) for hotel in mock_data.hotels]
+
+    async def insert_booking(self, booking_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        await self._latency("insert_booking")
+        row = dict(booking_data, booking_id=f"MK{len(self.bookings) + 1001}")
+        self.bookings.append(row)
+        return [row]
+
+    async def insert_bookings(self, bookings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        await self._latency("insert_bookings")
+        stored = {row.get("idempotency_key") for row in self.bookings}
+        rows = []
+        for booking in bookings:
+            if booking.get("idempotency_key") in stored:
+                continue
+            stored.add(booking.get("idempotency_key"))
+            rows.append(dict(booking, booking_id=f"MK{len(self.bookings) + 1001}"))
+            self.bookings.append(rows[-1])
+        return rows
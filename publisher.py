@@ -0,0 +1,157 @@
+# publisher.py
+# Data-channel publishing for the Assistant.
+#
+# Growing collections (cart lines, flight results) are sent as versioned
+# state blocks under their name in `data`:
+#   {"version": 7, "snapshot": [...]}                  full replacement
+#   {"version": 8, "upsert": [...], "remove": [ids]}   changes since version 7
+# A client that sees a delta whose version is not its last version + 1 sends
+# a `state_resync` packet and gets a snapshot of every collection back.
+import asyncio
+import json
+import logging
+import os
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List
+
+from livekit import rtc
+
+logger = logging.getLogger("publisher")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Topic the client sends on once its data-channel listener is attached
+CLIENT_READY_TOPIC = "client_ready"
+# Topic the client sends on when it lost track of a collection version
+RESYNC_TOPIC = "state_resync"
+# Send a full snapshot after this many consecutive deltas of a collection
+PUBLISH_SNAPSHOT_EVERY = int(os.getenv("PUBLISH_SNAPSHOT_EVERY", "20"))
+# Longest a publish waits for the client before sending anyway
+PUBLISH_READY_TIMEOUT = float(os.getenv("PUBLISH_READY_TIMEOUT", "0.5"))
+
+
+class ClientReadiness:
+    """
+    Tracks whether the room's client can receive data-channel messages.
+    Ready once the client sends a `client_ready` packet, or as soon as it
+    subscribes to the agent's audio track (clients that never ack). A client
+    that does neither within the timeout is taken as ready from then on.
+    """
+
+    def __init__(self, timeout: float = PUBLISH_READY_TIMEOUT, ready: bool = False):
+        self.timeout = timeout
+        self._ready = asyncio.Event()
+        if ready:
+            self._ready.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def attach(self, room: rtc.Room):
+        room.on("data_received", self._on_data_received)
+        room.on("local_track_subscribed", self._on_local_track_subscribed)
+
+    def mark_ready(self):
+        self._ready.set()
+
+    def _on_data_received(self, packet: rtc.DataPacket):
+        if packet.topic == CLIENT_READY_TOPIC:
+            self.mark_ready()
+
+    def _on_local_track_subscribed(self, *_):
+        self.mark_ready()
+
+    async def wait(self):
+        """Return as soon as the client is ready, or after the timeout (only the first time)."""
+        if self._ready.is_set():
+            return
+        try:
+            await asyncio.wait_for(self._ready.wait(), self.timeout)
+        except asyncio.TimeoutError:
+            # Don't delay every later publish by the timeout as well
+            logger.debug("no client_ready within %.1fs, publishing without it", self.timeout)
+            self.mark_ready()
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default)
+    return json.dumps(payload, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+class StatePublisher:
+    """Serializes each payload once and keeps per-collection versions for deltas."""
+
+    def __init__(self, participant, readiness: ClientReadiness | None = None,
+                 snapshot_every: int = PUBLISH_SNAPSHOT_EVERY):
+        self.participant = participant
+        # Without a readiness attached to a room there is nothing to wait for
+        self.readiness = readiness or ClientReadiness(ready=True)
+        self.snapshot_every = snapshot_every
+        self._versions: Dict[str, int] = {}
+        self._deltas: Dict[str, int] = {}  # deltas sent since the last snapshot
+        self._snapshots: Dict[str, Callable[[], List[Any]]] = {}
+        self._resync = set()
+        self._tasks = set()  # resyncs in flight (referenced so they aren't garbage-collected)
+
+    def attach(self, room: rtc.Room):
+        room.on("data_received", self._on_data_received)
+
+    def _on_data_received(self, packet: rtc.DataPacket):
+        if packet.topic == RESYNC_TOPIC:
+            self._resync.update(self._snapshots)
+            task = asyncio.create_task(self.resync())
+            self._tasks.add(task)
+            task.add_done_callback(self._resync_done)
+
+    def _resync_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("state resync failed", exc_info=task.exception())
+
+    def invalidate(self, name: str):
+        """Make the next block of `name` a snapshot (its contents were replaced)."""
+        self._resync.add(name)
+
+    async def publish(self, payload: dict) -> int:
+        """Send one payload; returns its size in bytes."""
+        await self.readiness.wait()
+        data = dumps(payload)
+        await self.participant.publish_data(payload=data, reliable=True)
+        return len(data)
+
+    def collection(self, name: str, snapshot: Callable[[], List[Any]],
+                   upsert: Iterable[Any] = (), remove: Iterable[Any] = (), reset: bool = False) -> dict:
+        """
+        Next state block for a collection. `snapshot` returns its full current
+        contents and is only called when a snapshot is due; `reset` forces one
+        (e.g. a new search replacing the old results).
+        """
+        self._snapshots[name] = snapshot
+        version = self._versions.get(name, 0) + 1
+        self._versions[name] = version
+        deltas = self._deltas.get(name, 0)
+        if reset or version == 1 or name in self._resync or deltas + 1 >= self.snapshot_every:
+            self._resync.discard(name)
+            self._deltas[name] = 0
+            return {"version": version, "snapshot": snapshot()}
+        self._deltas[name] = deltas + 1
+        return {"version": version, "upsert": list(upsert), "remove": list(remove)}
+
+    async def resync(self):
+        """Push a snapshot of every collection the client asked to resync."""
+        names = [name for name in self._snapshots if name in self._resync]
+        if not names:
+            return
+        data = {name: self.collection(name, self._snapshots[name]) for name in names}
+        await self.publish({"status": "sync", "action": None, "message": None, "data": data})
@@ -0,0 +1,67 @@
+# refreshing.py
+# Base for the process-wide lookup indexes (city codes, ride/hotel availability)
+# that every session on a worker shares.
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from repository import DataBackend, get_repository
+
+logger = logging.getLogger("refreshing")
+
+
+class RefreshingIndex:
+    """
+    Loaded once per worker process (normally from the prewarm hook) and
+    refreshed in the background once it is older than `ttl`. Lookups never
+    wait for a refresh after the first load. Subclasses implement `_reload`,
+    which fetches the rows and swaps in the new index.
+    """
+
+    def __init__(self, repository: DataBackend | None, ttl: float):
+        self._repository = repository
+        self.ttl = ttl
+        self._loaded_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def repository(self) -> DataBackend:
+        return self._repository or get_repository()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    @property
+    def stale(self) -> bool:
+        return not self.loaded or time.monotonic() - self._loaded_at > self.ttl
+
+    async def _reload(self):
+        raise NotImplementedError
+
+    async def refresh(self):
+        await self._reload()
+        self._loaded_at = time.monotonic()
+
+    def load(self):
+        """Blocking load for the worker prewarm hook (no event loop running yet)."""
+        asyncio.run(self.refresh())
+
+    async def ensure_loaded(self):
+        if not self.loaded:
+            await self._start_refresh()
+        elif self.stale:
+            # Serve the current index and refresh behind it
+            self._start_refresh()
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+            self._refresh_task.add_done_callback(self._refresh_done)
+        return self._refresh_task
+
+    def _refresh_done(self, task: asyncio.Task):
+        # Background refreshes have no one awaiting them; a failed one keeps the old index until the next try
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("%s refresh failed", type(self).__name__, exc_info=task.exception())
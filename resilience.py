@@ -0,0 +1,235 @@
+# resilience.py
+# Timeouts, circuit breaking, hedged reads and stale fallbacks around every
+# DataBackend call (README NFR-07).
+#
+#   call -> breaker open?        -> last good result for the same arguments (or CircuitOpenError)
+#        -> read, no answer by ~p95 -> second identical read, first answer wins
+#        -> per-endpoint timeout / error -> counted by the breaker, last good result if any
+#           (a rejected request, e.g. a 4xx, is not: the backend answered)
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from menu_cache import TTLCache
+from repository import ENDPOINT_TIMEOUTS, FLIGHT_PAGE_SIZE, DataBackend
+
+logger = logging.getLogger("resilience")
+
+# Consecutive failures that open a breaker, and how long it stays open before a trial call
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.getenv("BREAKER_RESET", "10"))
+# Hedge delay = recent p95 of the endpoint, clamped to [min, max] ms
+HEDGE_MIN_MS = float(os.getenv("HEDGE_MIN_MS", "50"))
+HEDGE_MAX_MS = float(os.getenv("HEDGE_MAX_MS", "1000"))
+# How long a last good read may still be served while the backend is failing
+STALE_TTL = float(os.getenv("STALE_TTL", "3600"))
+STALE_SIZE = int(os.getenv("STALE_SIZE", "1000"))
+# Per-endpoint timeouts are repository.ENDPOINT_TIMEOUTS (shared with the HTTP requests); reads are hedged, writes not
+
+
+class CircuitOpenError(Exception):
+    """The endpoint's breaker is open and there is nothing cached to serve."""
+
+
+def rejected(error: Exception) -> bool:
+    """
+    The backend answered and refused this request: PostgREST request errors
+    (4xx), Postgres data/constraint/schema errors (SQLSTATE 22, 23, 42), rows
+    that can't be serialized. Retrying won't help, and the backend is up.
+    Timeouts, connection errors, open breakers and 5xx are not rejections.
+    """
+    if isinstance(error, (ValueError, TypeError, KeyError)):
+        return True
+    code = getattr(error, "code", None)  # postgrest APIError
+    if isinstance(code, int):
+        return code < 500 and code not in (408, 429)  # HTTP status of a non-JSON error response
+    if isinstance(code, str):
+        return code.startswith(("PGRST1", "PGRST2", "22", "23", "42"))
+    return False
+
+
+class CircuitBreaker:
+    """Closed -> open after `failures` consecutive errors -> half-open (one trial call) after `reset` s."""
+
+    def __init__(self, name: str, failures: int = BREAKER_FAILURES, reset: float = BREAKER_RESET):
+        self.name = name
+        self.failures = failures
+        self.reset = reset
+        self._consecutive = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self._opened_at >= self.reset else "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def success(self):
+        self._consecutive = 0
+        self._opened_at = None
+        self._trial = False
+
+    def release(self):
+        """The call was abandoned (cancelled): neither a success nor a failure, but the trial slot is free again."""
+        self._trial = False
+
+    def failure(self):
+        self._consecutive += 1
+        if self._trial or self._consecutive >= self.failures:
+            if self._opened_at is None or self._trial:
+                logger.warning("circuit %s open after %d failures", self.name, self._consecutive)
+            self._opened_at = time.monotonic()
+            self._trial = False
+
+
+class LatencyWindow:
+    """Recent successful call durations, for the hedge delay."""
+
+    def __init__(self, size: int = 200):
+        self._samples: deque = deque(maxlen=size)
+
+    def add(self, ms: float):
+        self._samples.append(ms)
+
+    def p95(self) -> Optional[float]:
+        if len(self._samples) < 20:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[math.ceil(len(ordered) * 0.95) - 1]  # nearest rank
+
+
+class Endpoint:
+    def __init__(self, name: str, timeout: float, hedged: bool):
+        self.name = name
+        self.timeout = timeout
+        self.hedged = hedged
+        self.breaker = CircuitBreaker(name)
+        self.latency = LatencyWindow()
+
+    def hedge_delay(self) -> float:
+        p95 = self.latency.p95()
+        return min(max(p95 if p95 is not None else HEDGE_MAX_MS, HEDGE_MIN_MS), HEDGE_MAX_MS) / 1000
+
+    async def _hedged(self, call: Callable[[], Awaitable[Any]]):
+        first = asyncio.ensure_future(call())
+        pending = {first}
+        try:
+            # Also inside the try: a caller cancelled (or timed out) here must not orphan `first`
+            done, pending = await asyncio.wait(pending, timeout=self.hedge_delay())
+            if done:
+                return first.result()
+            second = asyncio.ensure_future(call())
+            pending = {first, second}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            # Both failed: surface the first one's error
+            return first.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, call: Callable[[], Awaitable[Any]]):
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.name)
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self._hedged(call) if self.hedged else call(), self.timeout)
+        except Exception as e:
+            if rejected(e):
+                # A bad request (one malformed booking row), not a failing backend
+                self.breaker.success()
+            else:
+                self.breaker.failure()
+            raise
+        except BaseException:
+            # Cancelled (interrupted tool, dropped prefetch): don't leave a half-open trial taken forever
+            self.breaker.release()
+            raise
+        self.breaker.success()
+        self.latency.add((time.perf_counter() - start) * 1000)
+        return result
+
+
+class ResilientRepository:
+    """
+    DataBackend wrapper used by get_repository(). Reads remember their last
+    good result per arguments and serve it while the backend is failing or
+    its breaker is open; writes are never retried or served from cache here
+    (BookingWriter owns booking retries).
+    """
+
+    def __init__(self, backend: DataBackend):
+        self.backend = backend
+        self.endpoints: Dict[str, Endpoint] = {
+            name: Endpoint(name, timeout, hedged=not name.startswith("insert_"))
+            for name, timeout in ENDPOINT_TIMEOUTS.items()
+        }
+        self._stale = TTLCache(STALE_TTL, STALE_SIZE)
+
+    def __getattr__(self, name):
+        # Anything not wrapped below (e.g. MockRepository.bookings) comes from the backend
+        return getattr(self.backend, name)
+
+    async def _read(self, name: str, key: Tuple, call: Callable[[], Awaitable[Any]]):
+        try:
+            result = await self.endpoints[name].call(call)
+        except Exception as e:
+            stale = self._stale.get(key)
+            if stale is None:
+                raise
+            logger.warning("%s failed (%s: %s), serving last good result", name, type(e).__name__, e)
+            return stale
+        self._stale.set(key, result)
+        return result
+
+    async def fetch_city_codes(self) -> List[Dict[str, Any]]:
+        return await self._read("fetch_city_codes", ("fetch_city_codes",), self.backend.fetch_city_codes)
+
+    async def search_flights(
+            self,
+            from_city_code: str,
+            to_city_code: str,
+            departure_date: str | None = None,
+            flight_class: str | None = None,
+            limit: int = FLIGHT_PAGE_SIZE,
+            cursor: str | None = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        args = (from_city_code, to_city_code, departure_date, flight_class, limit, cursor)
+        return await self._read("search_flights", ("search_flights",) + args,
+                                lambda: self.backend.search_flights(*args))
+
+    async def list_restaurants(self) -> List[Dict[str, Any]]:
+        return await self._read("list_restaurants", ("list_restaurants",), self.backend.list_restaurants)
+
+    async def get_menu(self, restaurant_id: Any) -> List[Dict[str, Any]]:
+        return await self._read("get_menu", ("get_menu", restaurant_id),
+                                lambda: self.backend.get_menu(restaurant_id))
+
+    async def list_rides(self) -> List[Dict[str, Any]]:
+        return await self._read("list_rides", ("list_rides",), self.backend.list_rides)
+
+    async def list_hotels(self) -> List[Dict[str, Any]]:
+        return await self._read("list_hotels", ("list_hotels",), self.backend.list_hotels)
+
+    async def insert_booking(self, booking_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await self.endpoints["insert_booking"].call(lambda: self.backend.insert_booking(booking_data))
+
+    async def insert_bookings(self, bookings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return await self.endpoints["insert_bookings"].call(lambda: self.backend.insert_bookings(bookings))
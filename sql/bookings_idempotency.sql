@@ -0,0 +1,7 @@
+-- Idempotency key for BookingWriter: one row per confirmed order, however
+-- many times its batch is retried (SupabaseRepository.insert_bookings upserts
+-- with on_conflict=idempotency_key, ignore_duplicates).
+alter table public.bookings add column if not exists idempotency_key uuid;
+
+create unique index if not exists bookings_idempotency_key_idx
+    on public.bookings (idempotency_key);
@@ -0,0 +1,12 @@
+-- Indexes backing SupabaseRepository.search_flights.
+-- Route + date equality filters, then keyset pagination on (price, id).
+create index if not exists flights_route_date_price_idx
+    on public.flights (from_city_code, to_city_code, flight_date, price, id);
+
+-- Same search when no departure date has been given yet.
+create index if not exists flights_route_price_idx
+    on public.flights (from_city_code, to_city_code, price, id);
+
+-- Cabin class filter (only when FLIGHT_CLASS_COLUMN is set), e.g.:
+-- create index if not exists flights_route_date_class_price_idx
+--     on public.flights (from_city_code, to_city_code, flight_date, class, price, id);
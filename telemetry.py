@@ -0,0 +1,212 @@
+# telemetry.py
+# Per-turn latency spans (STT, LLM, tool, DB, publish, TTS) keyed by session
+# and action number, exported as JSONL and/or a Prometheus text file.
+#
+#   TELEMETRY_JSONL=turns.jsonl TELEMETRY_PROM=/var/lib/node_exporter/xoti.prom python agent.py start
+#
+# Files are written from a worker thread, never on the event loop: every
+# TELEMETRY_FLUSH_INTERVAL seconds, when TELEMETRY_FLUSH_EVERY spans are
+# buffered, and once more when a session closes.
+#
+# Each JSONL line is one span:
+#   {"ts": 1718000000.1, "session": "room-1", "stage": "tool", "ms": 12.4, "tool": "add_to_cart", "action": 10}
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("telemetry")
+
+# Exporters; telemetry is off (spans cost one perf_counter pair) when neither is set
+TELEMETRY_JSONL = os.getenv("TELEMETRY_JSONL", "")
+TELEMETRY_PROM = os.getenv("TELEMETRY_PROM", "")
+# Buffered spans that trigger a JSONL flush, and seconds between periodic flushes
+TELEMETRY_FLUSH_EVERY = int(os.getenv("TELEMETRY_FLUSH_EVERY", "256"))
+TELEMETRY_FLUSH_INTERVAL = float(os.getenv("TELEMETRY_FLUSH_INTERVAL", "10"))
+# Histogram bucket bounds in ms (NFR-01: 5 s end to end, 2 s per API call)
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2000, 5000)
+
+# Session the current task belongs to (set once in the job entrypoint; tool tasks inherit it)
+current_session: contextvars.ContextVar[str] = contextvars.ContextVar("current_session", default="")
+# Function tool being run, so DB spans (and tasks a tool starts) are tagged with it
+current_tool: contextvars.ContextVar[str] = contextvars.ContextVar("current_tool", default="")
+
+
+class Telemetry:
+    """
+    Collects spans in memory and writes them out in batches. Spans inside a
+    tool are tagged with the tool name; the action number of a session's
+    last tool call is remembered so model-side stages (STT/LLM/TTS) of the
+    same turn carry it too.
+    """
+
+    def __init__(self, jsonl_path: str = TELEMETRY_JSONL, prom_path: str = TELEMETRY_PROM,
+                 flush_every: int = TELEMETRY_FLUSH_EVERY, flush_interval: float = TELEMETRY_FLUSH_INTERVAL):
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        # Set current_tool even with no exporter (the loop watchdog tags stalls with it)
+        self.tag_tools = False
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_action: Dict[str, Any] = {}
+        # (stage, action, tool) -> [bucket counts..., +Inf count, sum]
+        self._histograms: Dict[Tuple[str, str, str], List[float]] = {}
+        self._changed = False  # histograms observed since the last Prometheus write
+        self._flusher: Optional[asyncio.Task] = None  # periodic flushes on the job's loop
+        self._flushing: Optional[asyncio.Task] = None  # flush started by a full buffer
+        self._write_lock = threading.Lock()  # one writer thread at a time, in order
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.jsonl_path or self.prom_path)
+
+    def record(self, stage: str, ms: float, **tags):
+        if not self.enabled:
+            return
+        session = tags.pop("session", None) or current_session.get()
+        tags.setdefault("tool", current_tool.get() or None)
+        if tags.get("action") is not None:
+            self._last_action[session] = tags["action"]
+        elif not tags["tool"]:
+            tags["action"] = self._last_action.get(session)
+
+        if self.prom_path:
+            self._observe(stage, tags.get("action"), tags["tool"], ms)
+        if self.jsonl_path:
+            self._buffer.append({"ts": time.time(), "session": session, "stage": stage, "ms": round(ms, 3), **tags})
+            if len(self._buffer) >= self.flush_every:
+                self._flush_soon()
+
+    def _observe(self, stage: str, action: Any, tool: Optional[str], ms: float):
+        key = (stage, "" if action is None else str(action), tool or "")
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = [0] * (len(BUCKETS_MS) + 2)
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                histogram[i] += 1
+        histogram[-2] += 1
+        histogram[-1] += ms
+        self._changed = True
+
+    @contextmanager
+    def span(self, stage: str, **tags):
+        """Time the block; the yielded dict can take tags only known at the end (e.g. action)."""
+        start = time.perf_counter()
+        try:
+            yield tags
+        finally:
+            self.record(stage, (time.perf_counter() - start) * 1000, **tags)
+
+    def on_metrics(self, metrics):
+        """AgentSession `metrics_collected` handler: STT final, end of utterance, LLM TTFT, TTS TTFB."""
+        kind = type(metrics).__name__
+        speech_id = getattr(metrics, "speech_id", None)
+        if kind == "EOUMetrics":
+            self.record("stt_final", metrics.transcription_delay * 1000, speech_id=speech_id)
+            self.record("end_of_utterance", metrics.end_of_utterance_delay * 1000, speech_id=speech_id)
+        elif kind == "LLMMetrics" and metrics.ttft >= 0:
+            self.record("llm_ttft", metrics.ttft * 1000, speech_id=speech_id, tokens=metrics.total_tokens)
+        elif kind == "TTSMetrics" and metrics.ttfb >= 0:
+            self.record("tts_ttfb", metrics.ttfb * 1000, speech_id=speech_id)
+
+    def start(self):
+        """Flush every `flush_interval` s on the running loop, so the Prometheus file stays current."""
+        if not self.enabled or (self._flusher is not None and not self._flusher.done()):
+            return
+        self._flusher = asyncio.get_running_loop().create_task(self._flush_loop(), name="telemetry-flush")
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("telemetry flush failed")
+
+    async def close_session(self, session: Optional[str] = None):
+        self._last_action.pop(session or current_session.get(), None)
+        await self.flush()
+
+    def _flush_soon(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(*self._take())  # no loop to block (e.g. a script)
+            return
+        if self._flushing is None or self._flushing.done():
+            self._flushing = loop.create_task(self.flush())
+            self._flushing.add_done_callback(self._flush_done)
+
+    @staticmethod
+    def _flush_done(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("telemetry flush failed", exc_info=task.exception())
+
+    async def flush(self):
+        """Write buffered spans and the Prometheus file from a worker thread."""
+        buffer, prometheus = self._take()
+        if buffer or prometheus:
+            await asyncio.to_thread(self._write, buffer, prometheus)
+
+    def _take(self) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Buffered spans and the Prometheus text, taken on the loop so nothing changes under the writer."""
+        buffer, self._buffer = self._buffer, []
+        prometheus = None
+        if self.prom_path and self._changed:
+            self._changed = False
+            prometheus = self._prometheus_text()
+        return buffer, prometheus
+
+    def _write(self, buffer: List[Dict[str, Any]], prometheus: Optional[str]):
+        with self._write_lock:
+            if buffer:
+                with open(self.jsonl_path, "a") as f:
+                    f.writelines(json.dumps(span, default=str) + "\n" for span in buffer)
+            if prometheus is not None:
+                # Write-then-rename so the scraper never reads half a file
+                tmp = self.prom_path + ".tmp"
+                with open(tmp, "w") as f:
+                    f.write(prometheus)
+                os.replace(tmp, self.prom_path)
+
+    def _prometheus_text(self) -> str:
+        lines = ["# HELP xoti_stage_latency_ms Voice turn stage latency in milliseconds",
+                 "# TYPE xoti_stage_latency_ms histogram"]
+        for (stage, action, tool), histogram in sorted(self._histograms.items()):
+            labels = f'stage="{stage}",action="{action}",tool="{tool}"'
+            for bound, count in zip(BUCKETS_MS, histogram):
+                lines.append(f'xoti_stage_latency_ms_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'xoti_stage_latency_ms_bucket{{{labels},le="+Inf"}} {histogram[-2]}')
+            lines.append(f"xoti_stage_latency_ms_sum{{{labels}}} {histogram[-1]:.3f}")
+            lines.append(f"xoti_stage_latency_ms_count{{{labels}}} {histogram[-2]}")
+        return "\n".join(lines) + "\n"
+
+
+telemetry = Telemetry()
+
+
+def timed_tool(func):
+    """Record a `tool` span for a function tool, tagged with the action number it returned."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if not telemetry.enabled and not telemetry.tag_tools:
+            return await func(*args, **kwargs)
+        token = current_tool.set(func.__name__)
+        try:
+            with telemetry.span("tool", tool=func.__name__) as tags:
+                result = await func(*args, **kwargs)
+                if isinstance(result, dict):
+                    tags["action"] = result.get("action")
+                return result
+        finally:
+            current_tool.reset(token)
+    return wrapper
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import booking_writer as bw  # noqa: E402
+
+
+class RejectedRow(Exception):
+    """Shaped like postgrest's APIError."""
+
+    def __init__(self, code):
+        super().__init__(f"error {code}")
+        self.code = code
+
+
+class FlakyRepository:
+    """Times out once, then rejects any batch holding a row marked bad."""
+
+    def __init__(self):
+        self.stored = []
+        self.calls = 0
+
+    async def insert_bookings(self, rows):
+        self.calls += 1
+        if self.calls == 1:
+            raise TimeoutError()
+        if any(row.get("bad") for row in rows):
+            raise RejectedRow("23502")
+        self.stored.extend(rows)
+        return rows
+
+
+def _row(i, bad=False):
+    return {"idempotency_key": f"key-{i}", "booking_type": "food", "bad": bad}
+
+
+def test_rejected_row_is_dead_lettered_and_the_rest_stored(tmp_path, monkeypatch):
+    monkeypatch.setattr(bw, "BOOKING_RETRY_BASE", 0.001)
+    repository = FlakyRepository()
+    writer = bw.BookingWriter(repository=repository, wal_dir=str(tmp_path), flush_interval=0.05)
+
+    async def run():
+        for i in range(5):
+            await writer.submit(_row(i, bad=i == 2))
+        return await writer.drain(timeout=5)
+
+    assert asyncio.run(run())
+    assert sorted(row["idempotency_key"] for row in repository.stored) == ["key-0", "key-1", "key-3", "key-4"]
+    with open(tmp_path / bw.BOOKING_DEAD_LETTER) as f:
+        dead = [json.loads(line) for line in f]
+    assert [entry["row"]["idempotency_key"] for entry in dead] == ["key-2"]
+
+
+def test_rejected_errors():
+    assert not bw.rejected(TimeoutError())
+    assert not bw.rejected(RejectedRow("PGRST000"))
+    assert not bw.rejected(RejectedRow(503))
+    assert bw.rejected(RejectedRow("23505"))
+    assert bw.rejected(RejectedRow("PGRST204"))
+    assert bw.rejected(RejectedRow(400))
+
+
+def test_failed_dead_letter_write_keeps_the_flusher_running(tmp_path, monkeypatch):
+    monkeypatch.setattr(bw, "BOOKING_RETRY_BASE", 0.001)
+    repository = FlakyRepository()
+    writer = bw.BookingWriter(repository=repository, wal_dir=str(tmp_path), flush_interval=0.05)
+    dead_letter = bw.BookingWAL.dead_letter
+
+    def broken_dead_letter(self, row, error):
+        monkeypatch.setattr(bw.BookingWAL, "dead_letter", dead_letter)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(bw.BookingWAL, "dead_letter", broken_dead_letter)
+
+    async def run():
+        await writer.submit(_row(0, bad=True))
+        await writer.submit(_row(1))
+        return await writer.drain(timeout=5)
+
+    assert asyncio.run(run())
+    assert [row["idempotency_key"] for row in repository.stored] == ["key-1"]
+
+
+def test_failed_start_is_retried_by_the_next_submit(tmp_path, monkeypatch):
+    writer = bw.BookingWriter(repository=FlakyRepository(), wal_dir=str(tmp_path), flush_interval=0.05)
+    recover = bw.BookingWAL.recover
+
+    def broken_recover(self):
+        monkeypatch.setattr(bw.BookingWAL, "recover", recover)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(bw.BookingWAL, "recover", broken_recover)
+
+    async def run():
+        try:
+            await writer.submit(_row(0))
+        except OSError:
+            pass
+        else:
+            raise AssertionError("first submit should fail")
+        await writer.submit(_row(1))
+        return writer.pending
+
+    assert asyncio.run(run()) == 1
+
+
+def test_same_order_placed_again_gets_a_new_key():
+    order = {"booking_type": "food", "item_id": 3, "booking_details": {"items": [1]}, "total_price": "4.500"}
+    retried = dict(order, booking_date="2026-10-18T10:00:01")
+    assert bw.booking_key("s1", 1, order) == bw.booking_key("s1", 1, retried)
+    assert bw.booking_key("s1", 1, order) != bw.booking_key("s1", 2, order)
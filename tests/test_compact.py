@@ -0,0 +1,18 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compact import for_llm  # noqa: E402
+
+
+def test_non_record_lists_keep_their_fields():
+    passengers = [{"type": "adult", "count": 2}, {"type": "kid", "count": 0}]
+    res = {"status": "success", "action": 1, "message": "", "data": {"passengers": passengers}}
+    assert for_llm(res)["data"]["passengers"] == passengers
+
+
+def test_record_lists_are_projected():
+    menu = [{"id": 11, "name": "Fries", "price": 0.5, "image_url": "https://example.com/fries.png"}]
+    res = {"status": "success", "action": 9, "message": "Menu", "data": {"items": menu}}
+    assert for_llm(res)["data"]["items"] == [{"id": 11, "name": "Fries", "price": 0.5}]
@@ -0,0 +1,32 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from menu_cache import MenuCache  # noqa: E402
+
+
+class SlowRepository:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_menu(self, restaurant_id):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return [{"id": 1, "name": "Shawarma", "restaurant_id": restaurant_id}]
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_fetch():
+    repository = SlowRepository()
+    cache = MenuCache(repository)
+
+    async def run():
+        first = asyncio.create_task(cache.menu(7))
+        second = asyncio.create_task(cache.menu(7))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run())[0]["name"] == "Shawarma"
+    assert repository.calls == 1
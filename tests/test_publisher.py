@@ -0,0 +1,66 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from publisher import ClientReadiness, StatePublisher  # noqa: E402
+
+
+class StubParticipant:
+    def __init__(self):
+        self.sent = []
+
+    async def publish_data(self, payload, reliable=True, **kwargs):
+        self.sent.append(payload)
+
+
+def test_publisher_without_a_room_does_not_wait():
+    participant = StubParticipant()
+    publisher = StatePublisher(participant)
+    start = time.perf_counter()
+    asyncio.run(publisher.publish({"action": 8}))
+    assert time.perf_counter() - start < publisher.readiness.timeout / 2
+    assert participant.sent == [b'{"action":8}']
+
+
+def test_silent_client_only_delays_the_first_publish():
+    participant = StubParticipant()
+    publisher = StatePublisher(participant, ClientReadiness(timeout=0.1))
+
+    async def run():
+        timings = []
+        for action in (1, 2):
+            start = time.perf_counter()
+            await publisher.publish({"action": action})
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    first, second = asyncio.run(run())
+    assert first >= 0.1 and second < 0.05
+    assert len(participant.sent) == 2
+
+
+class FailingParticipant:
+    async def publish_data(self, payload, reliable=True, **kwargs):
+        raise ConnectionError("room closed")
+
+
+class Packet:
+    topic = "state_resync"
+
+
+def test_resync_task_is_kept_and_its_failure_logged(caplog):
+    publisher = StatePublisher(FailingParticipant())
+    publisher.collection("cart", lambda: [{"id": 1}])
+
+    async def resync():
+        publisher._on_data_received(Packet())
+        assert len(publisher._tasks) == 1
+        await asyncio.gather(*publisher._tasks, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(resync())
+    assert not publisher._tasks
+    assert "state resync failed" in caplog.text
@@ -0,0 +1,33 @@
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from city_index import CityIndex  # noqa: E402
+
+
+class FlakyCityCodes:
+    def __init__(self):
+        self.calls = 0
+
+    async def fetch_city_codes(self):
+        self.calls += 1
+        if self.calls > 1:
+            raise ConnectionError("backend down")
+        return [{"from_city": "Kuwait City", "from_city_code": "KWI", "to_city": "Dubai", "to_city_code": "DXB"}]
+
+
+def test_failed_background_refresh_is_logged_and_keeps_the_index(caplog):
+    index = CityIndex(FlakyCityCodes(), ttl=0)
+
+    async def run():
+        await index.ensure_loaded()  # first load
+        await index.ensure_loaded()  # stale: refresh in the background, which fails
+        await asyncio.sleep(0.01)
+
+    with caplog.at_level(logging.ERROR, logger="refreshing"):
+        asyncio.run(run())
+    assert "CityIndex refresh failed" in caplog.text
+    assert index.lookup("dubai") == ("dubai", "DXB")
@@ -0,0 +1,114 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resilience import CircuitOpenError, Endpoint, LatencyWindow  # noqa: E402
+
+
+async def _fail():
+    raise RuntimeError("backend down")
+
+
+async def _ok():
+    return "ok"
+
+
+def _half_open_endpoint() -> Endpoint:
+    endpoint = Endpoint("get_menu", timeout=1, hedged=False)
+    endpoint.breaker.failures = 1
+    endpoint.breaker.reset = 0.01
+    try:
+        asyncio.run(endpoint.call(_fail))
+    except RuntimeError:
+        pass
+    time.sleep(0.02)
+    assert endpoint.breaker.state == "half-open"
+    return endpoint
+
+
+def test_cancelled_trial_frees_the_half_open_slot():
+    endpoint = _half_open_endpoint()
+
+    async def cancel_trial():
+        task = asyncio.create_task(endpoint.call(lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        # The next call gets the trial and closes the breaker
+        return await endpoint.call(_ok)
+
+    assert asyncio.run(cancel_trial()) == "ok"
+    assert endpoint.breaker.state == "closed"
+
+
+def test_half_open_allows_one_trial_at_a_time():
+    endpoint = _half_open_endpoint()
+
+    async def concurrent_calls():
+        trial = asyncio.create_task(endpoint.call(lambda: asyncio.sleep(0.05, "ok")))
+        await asyncio.sleep(0)
+        try:
+            await endpoint.call(_ok)
+        except CircuitOpenError:
+            blocked = True
+        else:
+            blocked = False
+        return blocked, await trial
+
+    assert asyncio.run(concurrent_calls()) == (True, "ok")
+
+
+def test_rejected_requests_do_not_open_the_breaker():
+    class BadRow(Exception):
+        code = "23502"
+
+    async def reject():
+        raise BadRow()
+
+    endpoint = Endpoint("insert_bookings", timeout=1, hedged=False)
+    endpoint.breaker.failures = 2
+
+    async def run():
+        for _ in range(5):
+            try:
+                await endpoint.call(reject)
+            except BadRow:
+                pass
+
+    asyncio.run(run())
+    assert endpoint.breaker.state == "closed"
+
+
+def test_cancelled_hedged_read_cancels_the_first_call():
+    endpoint = Endpoint("get_menu", timeout=5, hedged=True)
+    started = []
+
+    async def slow():
+        started.append(asyncio.current_task())
+        await asyncio.sleep(10)
+
+    async def run():
+        caller = asyncio.create_task(endpoint._hedged(slow))
+        await asyncio.sleep(0.01)  # before the hedge delay
+        caller.cancel()
+        try:
+            await caller
+        except asyncio.CancelledError:
+            pass
+        await asyncio.sleep(0.01)
+        return started[0].cancelled()
+
+    assert asyncio.run(run())
+
+
+def test_p95_is_nearest_rank():
+    window = LatencyWindow()
+    for ms in range(1, 31):
+        window.add(ms)
+    assert window.p95() == 29  # ceil(0.95 * 30) = 29th of 30
@@ -0,0 +1,29 @@
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telemetry import Telemetry  # noqa: E402
+
+
+def test_prometheus_file_is_written_periodically_off_the_loop(tmp_path):
+    prom = str(tmp_path / "turns.prom")
+    telemetry = Telemetry(prom_path=prom, flush_interval=0.05)
+    threads = []
+    write = telemetry._write
+    telemetry._write = lambda *args: threads.append(threading.current_thread()) or write(*args)
+
+    async def run():
+        telemetry.start()
+        telemetry.record("tool", 12.0, session="room-1", tool="add_to_cart", action=10)
+        await asyncio.sleep(0.15)
+        written = os.path.exists(prom)  # before the session closes
+        await telemetry.close_session("room-1")
+        return written
+
+    assert asyncio.run(run())
+    assert threads and threading.main_thread() not in threads
+    with open(prom) as f:
+        assert 'xoti_stage_latency_ms_count{stage="tool",action="10",tool="add_to_cart"} 1' in f.read()